@@ -0,0 +1,352 @@
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from prettytable import PrettyTable
+from requests.adapters import HTTPAdapter
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / 'src'
+sys.path.append(str(SRC_DIR))
+
+CORPUS_DIR = BENCH_DIR / 'corpus'
+CORPUS_INDEX = 'index.json'
+BASELINE_FILE = BENCH_DIR / 'baseline.json'
+MODES = ('whats-new', 'latest-versions', 'pep', 'download')
+THRESHOLD = 0.2
+LATENCY = 0.05
+WORKERS = 8
+SYNTHETIC_PEPS = 700
+SYNTHETIC_VERSIONS = 20
+SYNTHETIC_ARCHIVE = 8 * 2 ** 20
+
+HEADER = ('Режим', 'Время, с', 'Страниц', 'Страниц/с', 'Разбор, с',
+          'Пик RSS, МБ')
+CORPUS_MISSING = (
+    'Корпус страниц не найден: {path}. '
+    'Запишите его с --record или создайте с --synthetic'
+)
+REGRESSION = (
+    'Режим {mode}: {pages_per_sec:.1f} страниц/с, '
+    'в базовом замере {baseline:.1f}'
+)
+UNKNOWN_MODES = 'Неизвестные режимы: {modes}'
+BASELINE_SAVED = 'Базовый замер сохранён: {path}'
+
+
+def corpus_name(url):
+    return hashlib.sha1(url.encode()).hexdigest()
+
+
+def load_corpus(corpus_dir):
+    index_path = corpus_dir / CORPUS_INDEX
+    if not index_path.exists():
+        sys.exit(CORPUS_MISSING.format(path=corpus_dir))
+    return json.loads(index_path.read_text())
+
+
+def save_corpus(corpus_dir, pages):
+    corpus_dir.mkdir(exist_ok=True)
+    index = {}
+    for url, content in pages.items():
+        index[url] = corpus_name(url)
+        (corpus_dir / index[url]).write_bytes(content)
+    (corpus_dir / CORPUS_INDEX).write_text(json.dumps(index, indent=1))
+
+
+class CorpusHandler(BaseHTTPRequestHandler):
+    """Отдаёт страницы корпуса по адресу вида /<host>/<path>."""
+
+    def log_message(self, *args):
+        pass
+
+    def find_page(self):
+        host, _, path = self.path.lstrip('/').partition('/')
+        name = self.server.index.get(f'https://{host}/{path}')
+        if name is None:
+            self.send_error(404)
+            return None
+        return (self.server.corpus_dir / name).read_bytes()
+
+    def send_page(self, content, body=True):
+        time.sleep(self.server.latency)
+        start, end = 0, len(content) - 1
+        byte_range = self.headers.get('Range')
+        if byte_range:
+            first, _, last = byte_range[6:].partition('-')
+            start, end = int(first), int(last or end)
+        self.send_response(206 if byte_range else 200)
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', f'"{corpus_name(self.path)}"')
+        self.end_headers()
+        if body:
+            self.wfile.write(content[start:end + 1])
+
+    def do_GET(self):
+        content = self.find_page()
+        if content is not None:
+            self.send_page(content)
+
+    def do_HEAD(self):
+        content = self.find_page()
+        if content is not None:
+            self.send_page(content, body=False)
+
+
+def start_server(corpus_dir, latency):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CorpusHandler)
+    server.daemon_threads = True
+    server.corpus_dir = corpus_dir
+    server.index = load_corpus(corpus_dir)
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Перенаправляет запросы к сайтам Python на локальный сервер."""
+
+    def __init__(self, port, **kwargs):
+        super().__init__(**kwargs)
+        self.port = port
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        request.url = (
+            f'http://127.0.0.1:{self.port}/{url.netloc}{url.path}'
+        )
+        return super().send(request, **kwargs)
+
+
+class RecordAdapter(HTTPAdapter):
+    """Сохраняет ответы на GET-запросы для корпуса."""
+
+    def __init__(self, pages, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = pages
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if request.method == 'GET' and response.status_code == 200:
+            self.pages[request.url] = response.content
+        return response
+
+
+def timed(function, totals):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            totals[0] += time.perf_counter() - start
+    return wrapper
+
+
+def run_mode(mode, port, workers):
+    import main
+    import specs
+    from configs import configure_argument_parser
+
+    main.BASE_DIR = Path(tempfile.mkdtemp())
+    parse_time = [0.0]
+    for module, name in ((specs, 'find_texts'), (specs, 'find_links')):
+        setattr(module, name, timed(getattr(module, name), parse_time))
+    pages = [0]
+    session = requests.Session()
+    session.mount('https://', ReplayAdapter(port, pool_maxsize=workers))
+    session.hooks['response'].append(
+        lambda response, **kwargs: pages.__setitem__(0, pages[0] + 1)
+    )
+    cli_args = configure_argument_parser(MODES).parse_args(
+        [mode, '--workers', str(workers), '--no-parsed-cache']
+    )
+    start = time.perf_counter()
+    for _ in main.MODE_TO_FUNCTION[mode](session, cli_args) or ():
+        pass
+    wall = time.perf_counter() - start
+    return {
+        'wall': wall,
+        'pages': pages[0],
+        'pages_per_sec': pages[0] / wall,
+        'parse': parse_time[0],
+        'peak_rss_mb': resource.getrusage(
+            resource.RUSAGE_SELF
+        ).ru_maxrss / 1024,
+    }
+
+
+def measure(mode, port, workers):
+    output = subprocess.run(
+        [sys.executable, __file__, mode, '--child', str(port),
+         '--workers', str(workers)],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def record(corpus_dir, modes, workers):
+    import main
+    from configs import configure_argument_parser
+
+    main.BASE_DIR = Path(tempfile.mkdtemp())
+    pages = {}
+    session = requests.Session()
+    session.mount('https://', RecordAdapter(pages))
+    for mode in modes:
+        cli_args = configure_argument_parser(MODES).parse_args(
+            [mode, '--workers', str(workers), '--no-parsed-cache']
+        )
+        for _ in main.MODE_TO_FUNCTION[mode](session, cli_args) or ():
+            pass
+    save_corpus(corpus_dir, pages)
+
+
+def synthetic_corpus(corpus_dir, peps, versions):
+    docs = 'https://docs.python.org/3/'
+    status = ('Active', 'Final', 'Draft', 'Rejected', 'Withdrawn')
+    body = '<p>Lorem <em>ipsum</em> dolor sit amet.</p>' * 300
+    pages = {
+        'https://peps.python.org/': (
+            '<section id="numerical-index">' + ''.join(
+                f'<a class="pep reference internal" href="pep-{number:04d}/"'
+                f'>{number}</a>' for number in range(peps)
+            ) + '</section>'
+        ),
+        docs + 'whatsnew/': (
+            '<section id="what-s-new-in-python">'
+            '<div class="toctree-wrapper"><ul>' + ''.join(
+                f'<li class="toctree-l1"><a href="3.{minor}.html">3.{minor}'
+                '</a></li>' for minor in range(versions)
+            ) + '</ul></div></section>'
+        ),
+        docs: (
+            '<div class="sphinxsidebarwrapper"><ul>' + ''.join(
+                f'<li><a href="{docs[:-2]}3.{minor}/">Python 3.{minor} '
+                '(stable)</a></li>' for minor in range(versions)
+            ) + '<li><a href="https://www.python.org/doc/versions/">'
+            'All versions</a></li></ul></div>'
+        ),
+        docs + 'download.html': (
+            '<div><table class="docutils"><a href="archives/'
+            'python-docs-pdf-a4.zip">zip</a></table></div>'
+        ),
+    }
+    for number in range(peps):
+        pages[f'https://peps.python.org/pep-{number:04d}/'] = (
+            f'<h1>PEP {number}</h1><dl><dt>Status</dt><dd><abbr>'
+            f'{status[number % len(status)]}</abbr></dd></dl>{body}'
+        )
+    for minor in range(versions):
+        pages[f'{docs}whatsnew/3.{minor}.html'] = (
+            f'<h1>What’s New In Python 3.{minor}</h1>'
+            f'<dl><dt>Editor</dt><dd>Editor {minor}</dd></dl>{body}'
+        )
+    pages = {url: page.encode() for url, page in pages.items()}
+    pages[docs + 'archives/python-docs-pdf-a4.zip'] = os.urandom(
+        SYNTHETIC_ARCHIVE
+    )
+    save_corpus(corpus_dir, pages)
+
+
+def check_regressions(report, baseline, threshold):
+    failures = []
+    for mode, metrics in report.items():
+        if mode not in baseline:
+            continue
+        expected = baseline[mode]['pages_per_sec']
+        if metrics['pages_per_sec'] < expected * (1 - threshold):
+            failures.append(REGRESSION.format(
+                mode=mode, pages_per_sec=metrics['pages_per_sec'],
+                baseline=expected
+            ))
+    return failures
+
+
+def print_report(report):
+    table = PrettyTable()
+    table.field_names = HEADER
+    table.align = 'l'
+    for mode, metrics in report.items():
+        table.add_row((
+            mode, f'{metrics["wall"]:.2f}', metrics['pages'],
+            f'{metrics["pages_per_sec"]:.1f}', f'{metrics["parse"]:.2f}',
+            f'{metrics["peak_rss_mb"]:.1f}'
+        ))
+    print(table)
+
+
+def configure_argument_parser():
+    parser = argparse.ArgumentParser(
+        description='Замер производительности режимов парсера'
+    )
+    parser.add_argument(
+        'modes', nargs='*', default=MODES,
+        help=f'Режимы для замера: {", ".join(MODES)}'
+    )
+    parser.add_argument('--corpus', type=Path, default=CORPUS_DIR,
+                        help='Папка с корпусом страниц')
+    parser.add_argument('--record', action='store_true',
+                        help='Записать корпус с настоящих сайтов')
+    parser.add_argument('--synthetic', action='store_true',
+                        help='Создать синтетический корпус')
+    parser.add_argument('--latency', type=float, default=LATENCY,
+                        help='Задержка локального сервера в секундах')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help='Количество потоков загрузки')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE,
+                        help='Файл базового замера')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Сохранить результат как базовый замер')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='Допустимое падение страниц/с, доля')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    return parser
+
+
+def main():
+    parser = configure_argument_parser()
+    args = parser.parse_args()
+    unknown = set(args.modes) - set(MODES)
+    if unknown:
+        parser.error(UNKNOWN_MODES.format(modes=', '.join(sorted(unknown))))
+    if args.child:
+        print(json.dumps(run_mode(args.modes[0], args.child, args.workers)))
+        return
+    if args.record:
+        record(args.corpus, args.modes, args.workers)
+    if args.synthetic:
+        synthetic_corpus(args.corpus, SYNTHETIC_PEPS, SYNTHETIC_VERSIONS)
+    server = start_server(args.corpus, args.latency)
+    port = server.server_address[1]
+    report = {
+        mode: measure(mode, port, args.workers) for mode in args.modes
+    }
+    server.shutdown()
+    print_report(report)
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=4))
+        print(BASELINE_SAVED.format(path=args.baseline))
+        return
+    if args.baseline.exists():
+        failures = check_regressions(
+            report, json.loads(args.baseline.read_text()), args.threshold
+        )
+        for failure in failures:
+            print(failure, file=sys.stderr)
+        sys.exit(bool(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,43 @@
 import argparse
 import logging
+from functools import partial
 from logging.handlers import RotatingFileHandler
 
 from constants import (
-    DT_FORMAT, LOG_FORMAT, OUTPUT_FILE, OUTPUT_PRETTY,
-    LOG_DIR, LOG_FILE
+    DT_FORMAT, LOG_FORMAT, OUTPUT_CHOICES,
+    LOG_DIR, LOG_FILE, PROCESSES, SEGMENTS, WORKERS,
+    CACHE_BACKENDS, CACHE_EXPIRE_URLS, CACHE_NAME, CACHE_SQLITE, MEGABYTE,
+    NEVER_EXPIRE, JITTER, BACKOFF, CONNECT_TIMEOUT, POOL_HOSTS, POOL_SIZE,
+    READ_TIMEOUT, RETRIES, RETRY_METHODS, RETRY_STATUSES, BURST, RATE,
+    PEP_SOURCE_HTML, PEP_SOURCES, BASE_DIR, MIRROR_DIR, SEARCH_LIMIT,
+    CRAWL_MAX_PAGES
 )
 
+ERROR_KEY_NUMBER = 'Ожидается КЛЮЧ=ЧИСЛО, получено {value}'
+ERROR_SHARD = 'Ожидается K/N, где 1 <= K <= N, получено {value}'
+
+
+def key_number(value):
+    key, _, number = value.rpartition('=')
+    if not key or not number.lstrip('-').isdigit():
+        raise argparse.ArgumentTypeError(ERROR_KEY_NUMBER.format(value=value))
+    return key, int(number)
+
+
+def shard(value):
+    number, _, shards = value.partition('/')
+    if not (number.isdigit() and shards.isdigit()) or not (
+        1 <= int(number) <= int(shards)
+    ):
+        raise argparse.ArgumentTypeError(ERROR_SHARD.format(value=value))
+    return int(number), int(shards)
+
 
 def configure_argument_parser(available_modes):
     parser = argparse.ArgumentParser(description='Парсер документации Python')
     parser.add_argument(
         'mode',
+        nargs='+',
         choices=available_modes,
         help='Режимы работы парсера'
     )
@@ -24,9 +50,208 @@ def configure_argument_parser(available_modes):
     parser.add_argument(
         '-o',
         '--output',
-        choices=(OUTPUT_PRETTY, OUTPUT_FILE),
+        choices=OUTPUT_CHOICES,
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        default=WORKERS,
+        help='Количество потоков для загрузки страниц'
+    )
+    parser.add_argument(
+        '-p',
+        '--processes',
+        type=int,
+        default=PROCESSES,
+        help='Количество процессов для разбора страниц'
+    )
+    parser.add_argument(
+        '-s',
+        '--segments',
+        type=int,
+        default=SEGMENTS,
+        help='Количество параллельных соединений для загрузки архива'
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Загружать только изменившиеся PEP'
+    )
+    parser.add_argument(
+        '--pep-source',
+        choices=PEP_SOURCES,
+        default=PEP_SOURCE_HTML,
+        help='Откуда брать статусы PEP: страницы или JSON-индекс'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Читать страницы из зеркала без обращения к сети'
+    )
+    parser.add_argument(
+        '-q',
+        '--query',
+        help='Поисковый запрос для режима search'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=SEARCH_LIMIT,
+        help='Сколько результатов поиска выводить'
+    )
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        default=CRAWL_MAX_PAGES,
+        help='Сколько страниц обойти в режиме crawl'
+    )
+    parser.add_argument(
+        '--max-depth',
+        type=int,
+        help='Глубина ссылок от стартовой страницы в режиме crawl'
+    )
+    parser.add_argument(
+        '--shard',
+        type=shard,
+        metavar='K/N',
+        help='Обработать K-ю из N частей списка PEP'
+    )
+    parser.add_argument(
+        '--shard-files',
+        nargs='+',
+        help='Файлы частей для режима merge'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Продолжить с последней контрольной точки'
+    )
+    parser.add_argument(
+        '--no-checkpoint',
+        dest='checkpoint',
+        action='store_false',
+        help='Не сохранять контрольные точки'
+    )
+    parser.add_argument(
+        '--cache-backend',
+        choices=CACHE_BACKENDS,
+        default=CACHE_SQLITE,
+        help='Хранилище кеша'
+    )
+    parser.add_argument(
+        '--cache-expire',
+        type=int,
+        default=NEVER_EXPIRE,
+        help=(
+            'Время жизни кеша в секундах; для адресов python.org действуют '
+            'шаблоны по умолчанию, их меняет --cache-expire-url'
+        )
+    )
+    parser.add_argument(
+        '--cache-expire-url',
+        type=key_number,
+        action='append',
+        default=[],
+        help='Время жизни кеша для адресов по шаблону: ШАБЛОН=СЕКУНДЫ'
+    )
+    parser.add_argument(
+        '--stale-while-revalidate',
+        type=int,
+        help='Сколько секунд отдавать устаревший кеш, обновляя его в фоне'
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=int,
+        help='Максимальный размер кеша в мегабайтах'
+    )
+    parser.add_argument(
+        '--no-parsed-cache',
+        dest='parsed_cache',
+        action='store_false',
+        help='Не использовать кеш разобранных страниц'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Вывести время работы этапов парсера'
+    )
+    parser.add_argument(
+        '--profile-json',
+        help='Сохранить время работы этапов в JSON-файл'
+    )
+    parser.add_argument(
+        '--cprofile',
+        help='Сохранить профиль cProfile в файл'
+    )
+    parser.add_argument(
+        '--watch',
+        type=float,
+        metavar='SECONDS',
+        help='Перезапускать режим с заданным интервалом в секундах'
+    )
+    parser.add_argument(
+        '--jitter',
+        type=float,
+        default=JITTER,
+        metavar='SECONDS',
+        help='Случайная добавка к интервалу --watch в секундах'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=READ_TIMEOUT,
+        metavar='SECONDS',
+        help='Таймаут ожидания ответа сервера в секундах'
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=RETRIES,
+        help='Количество повторов запроса при сбое'
+    )
+    parser.add_argument(
+        '--backoff',
+        type=float,
+        default=BACKOFF,
+        help='Множитель экспоненциальной паузы между повторами'
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=int,
+        default=POOL_SIZE,
+        help='Размер пула соединений к каждому сайту'
+    )
+    parser.add_argument(
+        '--host-pool-size',
+        type=key_number,
+        action='append',
+        default=[],
+        help='Размер пула соединений для сайта: ХОСТ=ЧИСЛО'
+    )
+    parser.add_argument(
+        '--no-keep-alive',
+        dest='keep_alive',
+        action='store_false',
+        help='Закрывать соединение после каждого запроса'
+    )
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=RATE,
+        help=(
+            'Максимум запросов в секунду к одному сайту; без него скорость '
+            'ограничивается, только когда сайт отвечает 429 или 503'
+        )
+    )
+    parser.add_argument(
+        '--burst',
+        type=int,
+        default=BURST,
+        help='Сколько запросов к сайту можно отправить без ожидания'
+    )
     return parser
 
 
@@ -43,3 +268,66 @@ def configure_logging():
         level=logging.INFO,
         handlers=(rotating_handler, logging.StreamHandler())
     )
+
+
+def configure_adapters(session, cli_args):
+    from urllib3.util.retry import Retry
+
+    from limiter import HostLimiter, RateLimitedAdapter
+    retries = Retry(
+        total=cli_args.retries,
+        backoff_factor=cli_args.backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False
+    )
+    pool_size = max(
+        cli_args.pool_size, cli_args.workers, cli_args.segments
+    )
+    pool_sizes = {
+        **{host: pool_size for host in POOL_HOSTS},
+        **dict(cli_args.host_pool_size)
+    }
+    limiter = HostLimiter(cli_args.rate, cli_args.burst)
+    adapter = partial(
+        RateLimitedAdapter, limiter, cli_args.retries, cli_args.backoff,
+        max_retries=retries
+    )
+    session.mount('https://', adapter(pool_maxsize=pool_size))
+    for host, size in pool_sizes.items():
+        session.mount(
+            f'https://{host}/', adapter(pool_connections=1, pool_maxsize=size)
+        )
+    if not cli_args.keep_alive:
+        session.headers['Connection'] = 'close'
+
+
+def urls_expire_after(cache_expire_url):
+    patterns = dict(cache_expire_url)
+    return {
+        **patterns,
+        **{
+            pattern: seconds
+            for pattern, seconds in CACHE_EXPIRE_URLS.items()
+            if pattern not in patterns
+        }
+    }
+
+
+def configure_session(cli_args):
+    from session import ParserSession
+    max_size = cli_args.cache_max_size
+    session = ParserSession(
+        CACHE_NAME,
+        backend=cli_args.cache_backend,
+        expire_after=cli_args.cache_expire,
+        urls_expire_after=urls_expire_after(cli_args.cache_expire_url),
+        stale_while_revalidate=cli_args.stale_while_revalidate or False,
+        max_size=max_size * MEGABYTE if max_size else None,
+        timeout=(min(CONNECT_TIMEOUT, cli_args.timeout), cli_args.timeout)
+    )
+    configure_adapters(session, cli_args)
+    if cli_args.offline:
+        from mirror import Mirror
+        session.mirror = Mirror(BASE_DIR / MIRROR_DIR, offline=True)
+    return session
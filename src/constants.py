@@ -5,10 +5,39 @@ LOG_DIR = BASE_DIR / 'logs'
 LOG_FILE = LOG_DIR / 'parser.log'
 DOWNLOAD_DIR = 'downloads'
 RESULTS_DIR = 'results'
+STATE_DIR = 'state'
+PEP_STATE_FILE = 'pep.json'
+PEP_SHARD_STATE_FILE = 'pep-{shard}-of-{shards}.json'
+CACHE_ACCESS_FILE = 'cache_access.json'
+PARSED_CACHE_FILE = 'parsed.sqlite'
+RESULTS_DB = 'results.sqlite'
+MIRROR_DIR = 'mirror'
+MIRROR_PACK = 'pages.pack'
+MIRROR_INDEX = 'pages.idx'
+INDEX_DIR = 'index'
+INDEX_FILE = 'index.json'
+POSTINGS_FILE = 'postings.bin'
+SEARCH_LIMIT = 10
+CRAWL_MAX_PAGES = 50_000
+SEEN_CAPACITY = 1024
+SHARD_FILE = 'pep-shard-{shard}-of-{shards}.json'
+SHARD_PATTERN = 'pep-shard-*-of-*.json'
+CHECKPOINT_FILE = 'checkpoint-{mode}.json'
+CHECKPOINT_EVERY = 50
 
 OUTPUT_PRETTY = 'pretty'
 OUTPUT_FILE = 'file'
+OUTPUT_CSV_GZIP = 'csv.gz'
+OUTPUT_CSV_ZSTD = 'csv.zst'
+OUTPUT_JSONL = 'jsonl'
+OUTPUT_PARQUET = 'parquet'
+OUTPUT_DB = 'db'
 DEFAULT_OUTPUT = None
+STDOUT_OUTPUTS = (DEFAULT_OUTPUT, OUTPUT_PRETTY)
+OUTPUT_CHOICES = (
+    OUTPUT_PRETTY, OUTPUT_FILE, OUTPUT_CSV_GZIP, OUTPUT_CSV_ZSTD,
+    OUTPUT_JSONL, OUTPUT_PARQUET, OUTPUT_DB
+)
 
 CODE_PAGES = 'utf-8'
 DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
@@ -16,10 +45,69 @@ LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 DT_FORMAT = '%d.%m.%Y %H:%M:%S'
 FILE_FORMAT = 'csv'
 MODE_OPEN_FILE = 'w'
+MODE_OPEN_TEXT = 'wt'
+MODE_APPEND = 'a'
+FLUSH_ROWS = 100
 MODE_DOWNLOAD = 'wb'
+MODE_RESUME = 'ab'
+CHUNK_SIZE = 64 * 1024
+ETAG_SUFFIX = '.etag'
+
+WORKERS = 1
+PROCESSES = 1
+PARSE_WINDOW = 4
+SEGMENTS = 1
+JITTER = 0
+
+CACHE_NAME = 'http_cache'
+CACHE_SQLITE = 'sqlite'
+CACHE_FILESYSTEM = 'filesystem'
+CACHE_MEMORY = 'memory'
+NO_CACHE_HEADER = 'X-Parser-No-Cache'
+CACHE_BACKENDS = (CACHE_SQLITE, CACHE_FILESYSTEM, CACHE_MEMORY)
+NEVER_EXPIRE = -1
+HOUR = 60 * 60
+DAY = 24 * HOUR
+CACHE_EXPIRE_URLS = {
+    'peps.python.org/pep-': 7 * DAY,
+    'peps.python.org': HOUR,
+    'docs.python.org/3/whatsnew/3.': 7 * DAY,
+    'docs.python.org': DAY,
+}
+MEGABYTE = 2 ** 20
+EVICT_RATIO = 0.9
+
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+RETRIES = 3
+BACKOFF = 0.5
+RETRY_STATUSES = (500, 502, 504)
+THROTTLE_STATUSES = (429, 503)
+RATE = None
+THROTTLED_RATE = 10
+BURST = 10
+RATE_MIN = 0.5
+RATE_DECREASE = 0.5
+RATE_INCREASE = 1
+MAX_RETRY_AFTER = 120
+RETRY_METHODS = frozenset(('GET', 'HEAD'))
+POOL_SIZE = 10
+POOL_HOSTS = ('docs.python.org', 'peps.python.org')
+
+MODE_PEP = 'pep'
+MODE_ALL = 'all'
+MODE_MIRROR = 'mirror'
+MODE_INDEX = 'index'
+MODE_SEARCH = 'search'
+MODE_CRAWL = 'crawl'
+MODE_MERGE = 'merge'
+PEP_SOURCE_HTML = 'html'
+PEP_SOURCE_JSON = 'json'
+PEP_SOURCES = (PEP_SOURCE_HTML, PEP_SOURCE_JSON)
 
 MAIN_DOC_URL = 'https://docs.python.org/3/'
 PEP_DOC_URL = 'https://peps.python.org/'
+PEP_JSON_URL = PEP_DOC_URL + 'api/peps.json'
 
 EXPECTED_STATUS = {
     'A': ('Active', 'Accepted'),
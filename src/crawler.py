@@ -0,0 +1,181 @@
+import array
+import hashlib
+import heapq
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import count
+from urllib.parse import (
+    parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+)
+
+from constants import CRAWL_MAX_PAGES, SEEN_CAPACITY
+from specs import CRAWL_LINKS
+from utils import get_response
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+SCHEMES = tuple(DEFAULT_PORTS)
+INDEX_PAGE = 'index.html'
+PAGE_SUFFIXES = ('/', '.html')
+TEXT_HTML = 'text/html'
+STATUS_OK = 200
+ERROR_PARSE = 'Не удалось разобрать страницу {url}: {error}'
+
+
+def normalize_url(url, base=None):
+    """Приводит адрес к единому виду или возвращает None.
+
+    Убирает фрагмент, порт по умолчанию и index.html, переводит схему
+    и хост в нижний регистр и сортирует параметры запроса.
+    """
+    try:
+        parts = urlsplit(urljoin(base, url.strip()) if base else url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in SCHEMES or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    if port not in (None, DEFAULT_PORTS[scheme]):
+        netloc = f'{netloc}:{port}'
+    path = parts.path or '/'
+    if path.endswith('/' + INDEX_PAGE):
+        path = path[:-len(INDEX_PAGE)]
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def in_scope(url, root):
+    return url.startswith(root) and urlsplit(url).path.endswith(
+        PAGE_SUFFIXES
+    )
+
+
+class SeenSet:
+    """Множество адресов в виде 64-битных хешей с открытой адресацией.
+
+    Ячейка занимает 8 байт вместо строки адреса, поэтому на десятках
+    тысяч адресов память остаётся ограниченной.
+    """
+
+    def __init__(self, capacity=SEEN_CAPACITY):
+        self.slots = array.array('Q', bytes(8 * capacity))
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, url):
+        digest = self.digest(url)
+        return self.slots[self.find(self.slots, digest)] == digest
+
+    @staticmethod
+    def digest(url):
+        return int.from_bytes(
+            hashlib.blake2b(url.encode(), digest_size=8).digest(), 'little'
+        ) | 1
+
+    @staticmethod
+    def find(slots, digest):
+        mask = len(slots) - 1
+        position = digest & mask
+        while slots[position] not in (0, digest):
+            position = (position + 1) & mask
+        return position
+
+    def add(self, url):
+        """Добавляет адрес; возвращает False, если он уже был."""
+        digest = self.digest(url)
+        position = self.find(self.slots, digest)
+        if self.slots[position] == digest:
+            return False
+        self.slots[position] = digest
+        self.size += 1
+        if self.size * 2 > len(self.slots):
+            self.grow()
+        return True
+
+    def grow(self):
+        slots = array.array('Q', bytes(16 * len(self.slots)))
+        for digest in self.slots:
+            if digest:
+                slots[self.find(slots, digest)] = digest
+        self.slots = slots
+
+
+class Frontier:
+    """Очередь адресов: сначала меньшая глубина, затем короткий путь."""
+
+    def __init__(self):
+        self.heap = []
+        self.order = count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, url, depth):
+        heapq.heappush(
+            self.heap, (depth, url.count('/'), next(self.order), url)
+        )
+
+    def pop(self):
+        depth, _, _, url = heapq.heappop(self.heap)
+        return url, depth
+
+
+def fetch_links(session, url):
+    try:
+        response = get_response(session, url)
+    except ConnectionError as error:
+        return None, [], error
+    content_type = response.headers.get('Content-Type', TEXT_HTML)
+    if response.status_code != STATUS_OK or TEXT_HTML not in content_type:
+        return response.status_code, [], None
+    from lxml.etree import ParserError
+    try:
+        links = CRAWL_LINKS(response.content)
+    except ParserError as error:
+        return response.status_code, [], ERROR_PARSE.format(
+            url=url, error=error
+        )
+    return response.status_code, [
+        urljoin(response.url or url, link) for link, _ in links
+    ], None
+
+
+def crawl_pages(session, root, workers=1, max_pages=CRAWL_MAX_PAGES,
+                max_depth=None):
+    """Обходит страницы внутри root и отдаёт (адрес, глубина, код, ошибка).
+
+    Одновременно загружается не больше workers страниц; новые адреса
+    попадают в очередь, только если их ещё не было в множестве seen.
+    """
+    root = normalize_url(root)
+    seen, frontier = SeenSet(), Frontier()
+    seen.add(root)
+    frontier.push(root, 0)
+    pending = {}
+    crawled = 0
+    workers = max(workers, 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while frontier or pending:
+            while (
+                frontier and len(pending) < workers
+                and crawled + len(pending) < max_pages
+            ):
+                url, depth = frontier.pop()
+                future = executor.submit(fetch_links, session, url)
+                pending[future] = url, depth
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, depth = pending.pop(future)
+                crawled += 1
+                status, links, error = future.result()
+                yield url, depth, status, error
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                for link in links:
+                    link = normalize_url(link)
+                    if link and in_scope(link, root) and seen.add(link):
+                        frontier.push(link, depth + 1)
@@ -1,3 +1,8 @@
 class ParserFindTagException(Exception):
     """Вызывается, когда парсер не может найти тег."""
     pass
+
+
+class DownloadCheckException(Exception):
+    """Вызывается, когда загруженный файл не прошёл проверку."""
+    pass
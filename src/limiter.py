@@ -0,0 +1,131 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from constants import (
+    BACKOFF, BURST, MAX_RETRY_AFTER, RATE, RATE_DECREASE, RATE_INCREASE,
+    RATE_MIN, RETRIES, THROTTLE_STATUSES, THROTTLED_RATE
+)
+
+
+def retry_after(response):
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    if value.strip().isdigit():
+        return min(int(value), MAX_RETRY_AFTER)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return min(max(date.timestamp() - time.time(), 0), MAX_RETRY_AFTER)
+
+
+class TokenBucket:
+    """Ведро токенов одного сайта с подстройкой скорости под ответы.
+
+    Без rate запросы не ограничиваются, пока сайт не ответит 429 или 503.
+    Каждый такой ответ снижает скорость вдвое, каждый успешный
+    поднимает её на RATE_INCREASE, но не выше rate, если он задан.
+    """
+
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = self.max_rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.lock = threading.Lock()
+
+    def refill(self, now):
+        if self.rate is None:
+            self.updated = now
+            return
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.rate is None:
+                    return
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttle(self, delay):
+        with self.lock:
+            self.rate = max(
+                RATE_MIN, (self.rate or THROTTLED_RATE) * RATE_DECREASE
+            )
+            self.tokens = min(self.tokens, 0)
+            self.blocked_until = max(
+                self.blocked_until, time.monotonic() + delay
+            )
+
+    def succeed(self):
+        with self.lock:
+            if self.rate is None:
+                return
+            self.rate += RATE_INCREASE
+            if self.max_rate is not None:
+                self.rate = min(self.max_rate, self.rate)
+
+
+class HostLimiter:
+    """Набор вёдер токенов по сайтам."""
+
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return self.buckets[host]
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """Ограничивает частоту запросов к сайту и ждёт при 429 и 503.
+
+    Адаптер вызывается только для запросов в сеть, поэтому ответы
+    из кеша сессии ограничение не проходят.
+    """
+
+    def __init__(self, limiter, retries=RETRIES, backoff=BACKOFF, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff = backoff
+
+    def send(self, request, **kwargs):
+        bucket = self.limiter.bucket(request.url)
+        for attempt in range(self.retries + 1):
+            bucket.acquire()
+            response = super().send(request, **kwargs)
+            if response.status_code not in THROTTLE_STATUSES:
+                bucket.succeed()
+                return response
+            delay = retry_after(response)
+            bucket.throttle(
+                self.backoff * 2 ** attempt if delay is None else delay
+            )
+            if attempt < self.retries:
+                response.close()
+        return response
@@ -1,18 +1,46 @@
 import logging
+from argparse import Namespace
+import random
 import re
+import threading
+import time
+import zlib
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from itertools import count
+from pathlib import Path
 from urllib.parse import urljoin
 
-import requests_cache
-from tqdm import tqdm
-
-from configs import configure_argument_parser, configure_logging
+from configs import (
+    configure_argument_parser, configure_logging, configure_session
+)
 from constants import (
     BASE_DIR, MAIN_DOC_URL, PEP_DOC_URL, EXPECTED_STATUS, DOWNLOAD_DIR,
-    MODE_DOWNLOAD
+    PARSED_CACHE_FILE, PEP_STATE_FILE, PROCESSES, SEGMENTS, STATE_DIR,
+    WORKERS, OUTPUT_DB, CHUNK_SIZE, PEP_JSON_URL, PEP_SOURCE_JSON, MODE_ALL,
+    STDOUT_OUTPUTS, MIRROR_DIR, MODE_MIRROR, PEP_SOURCE_HTML, INDEX_DIR,
+    MODE_INDEX, MODE_SEARCH, SEARCH_LIMIT, CRAWL_MAX_PAGES, MODE_CRAWL,
+    MODE_MERGE, RESULTS_DIR, SHARD_FILE, SHARD_PATTERN, CHECKPOINT_FILE,
+    PEP_SHARD_STATE_FILE
 )
+from crawler import crawl_pages
+from mirror import Mirror
 from outputs import control_output
-from utils import get_response, find_tag, get_soup
+from parsed_cache import ParsedCache
+from profiler import profile
+from search import SearchIndex
+from state import Checkpoint, load_state, save_state
+from specs import (
+    DOWNLOAD_LINKS, PEP_LINKS, PEP_PAGE, VERSION_LINKS, WHATS_NEW_LINKS,
+    WHATS_NEW_PAGE
+)
+from store import close_run, record_pep_statuses
+from utils import (
+    download_file, fetch_all, get_content, get_if_changed, get_response,
+    get_validators, iter_json_object, parse_all, progress_bar
+)
 
 ERROR_PEP_STATUS = (
     '\nНесовпадающие статусы:'
@@ -23,149 +51,588 @@ ERROR_PEP_STATUS = (
     '\n{expected_status}'
 )
 
-CHECK_URL = 'Возникла ошибка при загрузке страницы {session} {url} {a_tag}'
+CHECK_URL = 'Возникла ошибка при загрузке страницы: {error}'
+ERROR_STATUS = 'Страница {url} вернула код {status}'
 DOWNLOAD_RESULT = 'Архив был загружен и сохранён: {path}'
+MIRROR_RESULT = 'Зеркало {path} содержит страниц: {pages}'
+INDEX_RESULT = 'Страниц в индексе: {pages}, обновлено: {updated}'
+NO_QUERY = 'Для режима search укажите запрос: --query'
+NO_SHARDS = 'Не найдены файлы с результатами частей'
+SHARD_RESULT = 'Результат части сохранён: {path}'
+SHARDS_INCOMPLETE = 'Из {shards} частей нет результатов частей {missing}'
 CMD_ARGS = 'Аргументы командной строки: {args}'
 PARSER_START = 'Парсер запущен!'
 PARSER_END = 'Парсер завершил работу.'
 MESSAGE_ERRORS = 'Произошел сбой: {error}'
 NO_RESULTS = 'Ничего не нашлось'
+NO_CHANGES = 'Цикл {cycle}: результаты не изменились'
 HEADER_WHATS_NEW = ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
 HEADER_LATEST_VERSION = ('Ссылка на документацию', 'Версия', 'Статус')
 HEADER_PEP = ('Статус', 'Количество')
+HEADER_SEARCH = ('Ссылка', 'Заголовок', 'Оценка')
+HEADER_CRAWL = ('Ссылка', 'Код ответа', 'Глубина')
 PATH_NAME_WHATS_NEW = 'whatsnew/'
 PAGE_NAME_DOWNLOAD = 'download.html'
+NOT_MODIFIED = 304
+OUTPUT_LOCK = threading.Lock()
 
 
-def whats_new(session):
-    whats_new_url = urljoin(MAIN_DOC_URL, PATH_NAME_WHATS_NEW)
-    soup = get_soup(session, whats_new_url)
-    a_tags = soup.select(
-        '#what-s-new-in-python div.toctree-wrapper '
-        'li.toctree-l1 a[href$=".html"]'
+def open_checkpoint(cli_args, mode):
+    if not getattr(cli_args, 'checkpoint', False):
+        return None
+    return Checkpoint(
+        BASE_DIR / STATE_DIR / CHECKPOINT_FILE.format(mode=mode),
+        resume=getattr(cli_args, 'resume', False)
     )
-    results = [HEADER_WHATS_NEW]
+
+
+def resumable(urls, fetch, checkpoint):
+    """Отдаёт результаты по адресам, пропуская сохранённые в checkpoint.
+
+    fetch получает список адресов и отдаёт тройки (адрес, результат,
+    ошибка) в том же порядке. Результаты отдаются в порядке urls.
+    Контрольная точка сохраняется и при сбое; если все адреса
+    обработаны без ошибок, она удаляется.
+    """
+    if checkpoint is None:
+        yield from fetch(urls)
+        return
+    remaining = checkpoint.remaining(urls)
+    fetched = fetch(remaining)
+    remaining = set(remaining)
+    errors = 0
+    try:
+        for url in urls:
+            if url not in remaining:
+                yield url, checkpoint.done[url], None
+                continue
+            url, result, error = next(fetched)
+            if error is None:
+                checkpoint.add(url, result)
+            else:
+                errors += 1
+            yield url, result, error
+    except BaseException:
+        checkpoint.save()
+        raise
+    if errors:
+        checkpoint.save()
+    else:
+        checkpoint.complete()
+
+
+def find_whats_new_links(session):
+    whats_new_url = urljoin(MAIN_DOC_URL, PATH_NAME_WHATS_NEW)
+    return [
+        urljoin(whats_new_url, link) for link, _ in WHATS_NEW_LINKS(
+            get_content(session, whats_new_url)
+        )
+    ]
+
+
+def whats_new(session, cli_args=None):
+    version_links = find_whats_new_links(session)
+    yield HEADER_WHATS_NEW
     messages_error = []
-    for a_tag in tqdm(a_tags):
-        version_link = urljoin(whats_new_url, a_tag['href'])
-        try:
-            soup = get_soup(session, version_link)
-        except ConnectionError as error:
-            messages_error.append(CHECK_URL.format(error=error))
-            continue
-        results.append((
-            version_link,
-            find_tag(soup, 'h1').text,
-            find_tag(soup, 'dl').text.replace('\n', '')
-        ))
+    with open_parsed_cache(cli_args) as cache:
+        def fetch(urls):
+            pages = fetch_all(
+                session, urls,
+                getattr(cli_args, 'workers', WORKERS), fetch=get_content
+            )
+            return parse_all(
+                pages, WHATS_NEW_PAGE,
+                getattr(cli_args, 'processes', PROCESSES), cache
+            )
+
+        for version_link, fields, error in progress_bar(
+            resumable(
+                version_links, fetch,
+                open_checkpoint(cli_args, 'whats-new')
+            ),
+            total=len(version_links)
+        ):
+            if error is not None:
+                messages_error.append(CHECK_URL.format(error=error))
+                continue
+            yield (version_link, *fields)
     for message in messages_error:
         logging.error(message)
-    return results
 
 
-def latest_versions(session):
-    soup = get_soup(session, MAIN_DOC_URL)
-    ul_tags = soup.select('div.sphinxsidebarwrapper ul')
-    for ul in ul_tags:
-        if 'All versions' in ul.text:
-            a_tags = ul.find_all('a')
-            break
-    else:
+def latest_versions(session, cli_args=None):
+    a_tags = VERSION_LINKS(get_content(session, MAIN_DOC_URL))
+    if not a_tags:
         raise ValueError(NO_RESULTS)
-    results = [HEADER_LATEST_VERSION]
+    yield HEADER_LATEST_VERSION
     pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
-    for a_tag in a_tags:
-        text_match = re.search(pattern, a_tag.text)
+    for link, text in a_tags:
+        text_match = re.search(pattern, text)
         if text_match is None:
-            version, status = a_tag.text, ''
+            version, status = text, ''
         else:
             version, status = text_match.groups()
-        results.append((a_tag['href'], version, status))
-    return results
+        yield link, version, status
+
+
+def find_pep_links(content):
+    return [
+        urljoin(PEP_DOC_URL, link)
+        for link, _ in PEP_LINKS(content)
+    ]
+
+
+def open_parsed_cache(cli_args):
+    if not getattr(cli_args, 'parsed_cache', False):
+        return nullcontext()
+    return ParsedCache(BASE_DIR / STATE_DIR / PARSED_CACHE_FILE)
 
 
-def pep(session):
-    soup = get_soup(session, PEP_DOC_URL)
-    a_tags = soup.select(
-        '#numerical-index a.pep.reference.internal'
+def pep_status(content):
+    status, = PEP_PAGE(content)
+    return status
+
+
+def fetch_pep_statuses(session, pep_urls, cli_args, cache):
+    pages = fetch_all(
+        session, pep_urls,
+        getattr(cli_args, 'workers', WORKERS), fetch=get_content
     )
-    statuses = []
+    for pep_url, fields, error in parse_all(
+        pages, PEP_PAGE, getattr(cli_args, 'processes', PROCESSES), cache
+    ):
+        yield pep_url, None if error else fields[0], error
+
+
+def fetch_changed_pep_statuses(session, pep_urls, workers, pages):
+    def fetch(session, url):
+        return get_if_changed(session, url, pages.get(url))
+
+    for pep_url, response, error in fetch_all(
+        session, pep_urls, workers, fetch=fetch
+    ):
+        if error is not None:
+            yield pep_url, None, error
+            continue
+        page = pages.get(pep_url, {})
+        if response.status_code != NOT_MODIFIED:
+            validators = get_validators(response)
+            if validators['hash'] != page.get('hash'):
+                validators['status'] = pep_status(response.content)
+            else:
+                validators['status'] = page['status']
+            pages[pep_url] = page = validators
+        yield pep_url, page['status'], None
+
+
+def in_shard(url, shard):
+    if shard is None:
+        return True
+    number, shards = shard
+    return zlib.crc32(url.encode()) % shards == number - 1
+
+
+def pep_state_path(shard=None):
+    if shard is None:
+        return BASE_DIR / STATE_DIR / PEP_STATE_FILE
+    number, shards = shard
+    return BASE_DIR / STATE_DIR / PEP_SHARD_STATE_FILE.format(
+        shard=number, shards=shards
+    )
+
+
+def pep_statuses_incremental(session, workers, shard=None):
+    state_path = pep_state_path(shard)
+    state = load_state(state_path, {'index': {}, 'pages': {}})
+    response = get_if_changed(session, PEP_DOC_URL, state['index'])
+    if not response.ok:
+        raise ConnectionError(ERROR_STATUS.format(
+            url=PEP_DOC_URL, status=response.status_code
+        ))
+    index = state['index']
+    if response.status_code != NOT_MODIFIED:
+        index = get_validators(response)
+    if index.get('hash') == state['index'].get('hash'):
+        for pep_url, page in state['pages'].items():
+            if in_shard(pep_url, shard):
+                yield pep_url, page['status'], None
+        return
+    pep_urls = [
+        url for url in find_pep_links(response.content)
+        if in_shard(url, shard)
+    ]
+    pages = state['pages']
+    errors = 0
+    for pep_url, status, error in progress_bar(
+        fetch_changed_pep_statuses(session, pep_urls, workers, pages),
+        total=len(pep_urls)
+    ):
+        errors += error is not None
+        yield pep_url, status, error
+    save_state(state_path, {
+        'index': {} if errors else index,
+        'pages': {url: pages[url] for url in pep_urls if url in pages},
+    })
+
+
+def is_expected_status(status):
+    return isinstance(status, str) and status in (
+        *EXPECTED_STATUS.get(status[:1], ()), *EXPECTED_STATUS['']
+    )
+
+
+def pep_statuses_json(session, cli_args, cache):
+    disagreeing = []
+    with get_response(session, PEP_JSON_URL, stream=True) as response:
+        if not response.ok:
+            raise ConnectionError(ERROR_STATUS.format(
+                url=PEP_JSON_URL, status=response.status_code
+            ))
+        for number, entry in iter_json_object(
+            response.iter_content(chunk_size=CHUNK_SIZE)
+        ):
+            pep_url = entry.get('url') or urljoin(
+                PEP_DOC_URL, f'pep-{int(number):04d}/'
+            )
+            if not in_shard(pep_url, getattr(cli_args, 'shard', None)):
+                continue
+            if is_expected_status(entry.get('status')):
+                yield pep_url, entry['status'], None
+            else:
+                disagreeing.append(pep_url)
+    yield from fetch_pep_statuses(session, disagreeing, cli_args, cache)
+
+
+def pep_statuses(session, cli_args, cache):
+    if getattr(cli_args, 'pep_source', None) == PEP_SOURCE_JSON:
+        return pep_statuses_json(session, cli_args, cache)
+    if getattr(cli_args, 'incremental', False):
+        return pep_statuses_incremental(
+            session, getattr(cli_args, 'workers', WORKERS),
+            getattr(cli_args, 'shard', None)
+        )
+    pep_urls = [
+        url for url in find_pep_links(get_content(session, PEP_DOC_URL))
+        if in_shard(url, getattr(cli_args, 'shard', None))
+    ]
+    return progress_bar(
+        resumable(
+            pep_urls,
+            lambda urls: fetch_pep_statuses(session, urls, cli_args, cache),
+            open_checkpoint(cli_args, 'pep')
+        ),
+        total=len(pep_urls)
+    )
+
+
+def collect_statuses(pep_statuses):
+    counter = Counter()
     messages = []
     messages_error = []
-    for a_tag in tqdm(a_tags):
-        link = a_tag['href']
-        pep_url = urljoin(PEP_DOC_URL, link)
-        try:
-            soup = get_soup(session, pep_url)
-        except ConnectionError as error:
+    for pep_url, status, error in pep_statuses:
+        if error is not None:
             messages_error.append(CHECK_URL.format(error=error))
             continue
-        abbr_tags = find_tag(soup, 'abbr')
-        status = abbr_tags.text
         abbreviation_status = status[0]
-        statuses.append(status)
+        counter[status] += 1
         if status not in EXPECTED_STATUS[abbreviation_status]:
             messages.append(ERROR_PEP_STATUS.format(
                 pep_url=pep_url,
                 status=status,
                 expected_status=EXPECTED_STATUS[abbreviation_status]
             ))
+    return counter, messages, messages_error
+
+
+def log_messages(messages, messages_error):
     for message in messages_error:
         logging.error(message)
     for message in messages:
         logging.warning(message)
-    counter = Counter(statuses)
-    results = [
+
+
+def statuses_table(counter):
+    return [
         HEADER_PEP,
         *counter.items(),
+        ('Итого:', sum(counter.values())),
     ]
-    results.append(('Итого:', len(statuses)))
-    return results
 
 
-def download(session):
+def count_statuses(pep_statuses):
+    counter, messages, messages_error = collect_statuses(pep_statuses)
+    log_messages(messages, messages_error)
+    return statuses_table(counter)
+
+
+def shard_path(shard):
+    number, shards = shard
+    return BASE_DIR / RESULTS_DIR / SHARD_FILE.format(
+        shard=number, shards=shards
+    )
+
+
+def pep(session, cli_args=None):
+    with open_parsed_cache(cli_args) as cache:
+        statuses = pep_statuses(session, cli_args, cache)
+        if getattr(cli_args, 'output', None) == OUTPUT_DB:
+            statuses = record_pep_statuses(statuses, cli_args)
+        shard = getattr(cli_args, 'shard', None)
+        if shard is None:
+            yield from count_statuses(statuses)
+            return
+        counter, messages, messages_error = collect_statuses(statuses)
+    log_messages(messages, messages_error)
+    path = shard_path(shard)
+    save_state(path, {
+        'shard': list(shard),
+        'counts': list(counter.items()),
+        'messages': messages,
+        'errors': messages_error,
+    })
+    logging.info(SHARD_RESULT.format(path=path))
+    yield from statuses_table(counter)
+
+
+def merge(session, cli_args=None):
+    paths = getattr(cli_args, 'shard_files', None) or sorted(
+        (BASE_DIR / RESULTS_DIR).glob(SHARD_PATTERN)
+    )
+    if not paths:
+        raise ValueError(NO_SHARDS)
+    counter = Counter()
+    messages = []
+    messages_error = []
+    shards = {}
+    for path in paths:
+        partial_result = load_state(Path(path))
+        number, total = partial_result['shard']
+        shards.setdefault(total, set()).add(number)
+        for status, amount in partial_result['counts']:
+            counter[status] += amount
+        messages.extend(partial_result['messages'])
+        messages_error.extend(partial_result['errors'])
+    for total, numbers in shards.items():
+        missing = sorted(set(range(1, total + 1)) - numbers)
+        if len(shards) > 1 or missing:
+            logging.warning(SHARDS_INCOMPLETE.format(
+                shards=total, missing=missing
+            ))
+    log_messages(messages, messages_error)
+    yield from statuses_table(counter)
+
+
+def download(session, cli_args=None):
     downloads_url = urljoin(MAIN_DOC_URL, PAGE_NAME_DOWNLOAD)
-    response = get_response(session, downloads_url)
-    soup = get_soup(session, downloads_url)
-    pdf_a4_link = soup.select_one(
-        'div table.docutils a[href$="a4.zip"]')['href']
+    links = DOWNLOAD_LINKS(get_content(session, downloads_url))
+    if not links:
+        raise ValueError(NO_RESULTS)
+    pdf_a4_link, _ = links[0]
     archive_url = urljoin(downloads_url, pdf_a4_link)
     filename = archive_url.split('/')[-1]
     download_dir = BASE_DIR / DOWNLOAD_DIR
     download_dir.mkdir(exist_ok=True)
-    archive_path = download_dir / filename
-    with open(archive_path, MODE_DOWNLOAD) as file:
-        file.write(response.content)
+    archive_path = download_file(
+        session, archive_url, download_dir / filename,
+        getattr(cli_args, 'segments', SEGMENTS)
+    )
     message = DOWNLOAD_RESULT.format(path=archive_path)
     logging.info(message)
 
 
+def mirror(session, cli_args=None):
+    mirror_args = Namespace(**{
+        **vars(cli_args or Namespace()),
+        'incremental': False, 'parsed_cache': False, 'checkpoint': False,
+        'pep_source': PEP_SOURCE_HTML, 'output': None,
+    })
+    mirror_path = BASE_DIR / MIRROR_DIR
+    pages = Mirror(mirror_path)
+    previous, session.mirror = getattr(session, 'mirror', None), pages
+    try:
+        get_content(session, PEP_JSON_URL)
+        for mode in MIRROR_MODES:
+            try:
+                for _ in MODE_TO_FUNCTION[mode](session, mirror_args):
+                    pass
+            except Exception as error:
+                logging.exception(MESSAGE_ERRORS.format(error=error))
+    finally:
+        session.mirror = previous
+        pages.close()
+    logging.info(MIRROR_RESULT.format(path=mirror_path, pages=len(pages)))
+
+
+def index(session, cli_args=None):
+    urls = [
+        *find_whats_new_links(session),
+        *find_pep_links(get_content(session, PEP_DOC_URL)),
+    ]
+    messages_error = []
+
+    def pages():
+        for url, page, error in progress_bar(fetch_all(
+            session, urls,
+            getattr(cli_args, 'workers', WORKERS), fetch=get_content
+        ), total=len(urls)):
+            if error is not None:
+                messages_error.append(CHECK_URL.format(error=error))
+            yield url, page
+
+    with SearchIndex(BASE_DIR / INDEX_DIR) as search_index:
+        updated = search_index.update(pages())
+        indexed = len(search_index.docs)
+    for message in messages_error:
+        logging.error(message)
+    logging.info(INDEX_RESULT.format(pages=indexed, updated=updated))
+
+
+def search(session, cli_args=None):
+    query = getattr(cli_args, 'query', None)
+    if not query:
+        raise ValueError(NO_QUERY)
+    with SearchIndex(BASE_DIR / INDEX_DIR) as search_index:
+        results = search_index.search(
+            query, getattr(cli_args, 'limit', SEARCH_LIMIT)
+        )
+    yield HEADER_SEARCH
+    yield from results
+
+
+def crawl(session, cli_args=None):
+    yield HEADER_CRAWL
+    messages_error = []
+    for url, depth, status, error in crawl_pages(
+        session, MAIN_DOC_URL,
+        getattr(cli_args, 'workers', WORKERS),
+        getattr(cli_args, 'max_pages', CRAWL_MAX_PAGES),
+        getattr(cli_args, 'max_depth', None)
+    ):
+        if error is not None:
+            messages_error.append(CHECK_URL.format(error=error))
+        yield url, status, depth
+    for message in messages_error:
+        logging.error(message)
+
+
 MODE_TO_FUNCTION = {
     'whats-new': whats_new,
     'latest-versions': latest_versions,
     'download': download,
-    'pep': pep
+    'pep': pep,
+    MODE_MIRROR: mirror,
+    MODE_INDEX: index,
+    MODE_SEARCH: search,
+    MODE_CRAWL: crawl,
+    MODE_MERGE: merge,
 }
+NOT_IN_ALL = (MODE_MIRROR, MODE_INDEX, MODE_SEARCH, MODE_CRAWL, MODE_MERGE)
+MIRROR_MODES = ('whats-new', 'latest-versions', 'pep')
+
+
+def watch_cycle(session, cli_args, cycle, previous):
+    try:
+        results = MODE_TO_FUNCTION[cli_args.mode](session, cli_args)
+        results = None if results is None else list(results)
+    except Exception as error:
+        logging.exception(MESSAGE_ERRORS.format(error=error))
+        return previous
+    if results is None or results == previous:
+        logging.info(NO_CHANGES.format(cycle=cycle))
+        return previous
+    with OUTPUT_LOCK:
+        control_output(results, cli_args)
+    return results
+
+
+def watch(session, cli_args, cycles=None, stop=None):
+    previous = None
+    for cycle in count() if cycles is None else range(cycles):
+        if cycle:
+            delay = cli_args.watch + random.uniform(0, cli_args.jitter)
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                return
+        try:
+            previous = watch_cycle(session, cli_args, cycle, previous)
+        finally:
+            close_run(cli_args)
+            if getattr(session, 'persistent', False):
+                session.evict()
+
+
+def run_mode(session, cli_args):
+    results = MODE_TO_FUNCTION[cli_args.mode](session, cli_args)
+    if results is None:
+        return None
+    if cli_args.output in STDOUT_OUTPUTS:
+        return list(results)
+    control_output(results, cli_args)
+    return None
+
+
+def run_modes(session, cli_args):
+    modes = (
+        [mode for mode in MODE_TO_FUNCTION if mode not in NOT_IN_ALL]
+        if MODE_ALL in cli_args.mode
+        else list(dict.fromkeys(cli_args.mode))
+    )
+    modes_args = [
+        Namespace(**{**vars(cli_args), 'mode': mode}) for mode in modes
+    ]
+    if len(modes_args) == 1:
+        if cli_args.watch:
+            return watch(session, modes_args[0])
+        results = MODE_TO_FUNCTION[modes[0]](session, modes_args[0])
+        if results is not None:
+            control_output(results, modes_args[0])
+        return None
+    stop = threading.Event()
+    run = partial(watch, stop=stop) if cli_args.watch else run_mode
+    with ThreadPoolExecutor(max_workers=len(modes_args)) as executor:
+        runs = [
+            (mode_args, executor.submit(run, session, mode_args))
+            for mode_args in modes_args
+        ]
+        try:
+            for mode_args, future in runs:
+                try:
+                    results = future.result()
+                except Exception as error:
+                    logging.exception(MESSAGE_ERRORS.format(error=error))
+                    continue
+                if results is not None:
+                    control_output(results, mode_args)
+        finally:
+            stop.set()
 
 
 def main():
+    session = None
     try:
         configure_logging()
         logging.info(PARSER_START)
-        arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+        arg_parser = configure_argument_parser((*MODE_TO_FUNCTION, MODE_ALL))
         args = arg_parser.parse_args()
         message = CMD_ARGS.format(args=args)
         logging.info(message)
-        session = requests_cache.CachedSession()
+        session = configure_session(args)
         if args.clear_cache:
             session.cache.clear()
-        parser_mode = args.mode
-        results = MODE_TO_FUNCTION[parser_mode](session)
-        if results is not None:
-            control_output(results, args)
+            parsed_cache_path = BASE_DIR / STATE_DIR / PARSED_CACHE_FILE
+            with ParsedCache(parsed_cache_path) as parsed_cache:
+                parsed_cache.clear()
+        with profile(args):
+            run_modes(session, args)
+        logging.info(PARSER_END)
+    except KeyboardInterrupt:
         logging.info(PARSER_END)
     except Exception as error:
         logging.exception(MESSAGE_ERRORS.format(error=error))
+    finally:
+        if session is not None:
+            session.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,108 @@
+import hashlib
+import mmap
+import os
+import threading
+
+from requests.models import Response
+
+from constants import (
+    CODE_PAGES, MIRROR_INDEX, MIRROR_PACK, MODE_RESUME, MODE_APPEND
+)
+
+ERROR_MIRROR = 'Страницы {url} нет в зеркале'
+MIRROR_STATUS = 200
+
+
+class Mirror:
+    """Зеркало страниц: файл с содержимым и индекс смещений.
+
+    Оба файла только дописываются. Строка индекса хранит смещение,
+    длину, хеш содержимого и адрес; одинаковое содержимое хранится
+    один раз, а последняя строка для адреса заменяет предыдущие.
+    """
+
+    def __init__(self, path, offline=False):
+        path.mkdir(parents=True, exist_ok=True)
+        self.pack_path = path / MIRROR_PACK
+        self.index_path = path / MIRROR_INDEX
+        self.offline = offline
+        self.pages = {}
+        self.blobs = {}
+        self.map = None
+        self.lock = threading.Lock()
+        if self.index_path.exists():
+            with open(self.index_path, encoding=CODE_PAGES) as index:
+                for line in index:
+                    offset, length, digest, url = line.split(' ', 3)
+                    self.remember(
+                        url.rstrip('\n'), int(offset), int(length), digest
+                    )
+        self.pack = self.index = None
+        if not offline:
+            self.pack = open(self.pack_path, MODE_RESUME)
+            self.index = open(
+                self.index_path, MODE_APPEND, encoding=CODE_PAGES
+            )
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __contains__(self, url):
+        return url in self.pages
+
+    def remember(self, url, offset, length, digest):
+        self.pages[url] = offset, length, digest
+        self.blobs[digest] = offset, length
+
+    def add(self, url, content):
+        digest = hashlib.sha256(content).hexdigest()
+        with self.lock:
+            if url in self.pages and self.pages[url][2] == digest:
+                return
+            if digest in self.blobs:
+                offset, length = self.blobs[digest]
+            else:
+                offset, length = self.pack.seek(0, os.SEEK_END), len(content)
+                self.pack.write(content)
+                self.pack.flush()
+            self.index.write(f'{offset} {length} {digest} {url}\n')
+            self.index.flush()
+            self.remember(url, offset, length, digest)
+
+    def read(self, url):
+        if url not in self.pages:
+            return None
+        offset, length, _ = self.pages[url]
+        with self.lock:
+            if self.map is None or len(self.map) < offset + length:
+                self.remap()
+            if self.map is None or len(self.map) < offset + length:
+                return None
+            return self.map[offset:offset + length]
+
+    def remap(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.pack_path.exists() and self.pack_path.stat().st_size:
+            with open(self.pack_path, 'rb') as pack:
+                self.map = mmap.mmap(
+                    pack.fileno(), 0, access=mmap.ACCESS_READ
+                )
+
+    def response(self, url):
+        content = self.read(url)
+        if content is None:
+            raise ConnectionError(ERROR_MIRROR.format(url=url))
+        response = Response()
+        response.url = url
+        response.status_code = MIRROR_STATUS
+        response._content = content
+        response._content_consumed = True
+        return response
+
+    def close(self):
+        for file in (self.pack, self.index, self.map):
+            if file is not None:
+                file.close()
+        self.pack = self.index = self.map = None
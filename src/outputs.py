@@ -1,54 +1,179 @@
 import csv
 import datetime as dt
+import gzip
+import json
 import logging
-
-from prettytable import PrettyTable
+from itertools import chain, islice, repeat
 
 from constants import (
     BASE_DIR, DATETIME_FORMAT, CODE_PAGES, OUTPUT_PRETTY,
     OUTPUT_FILE, DEFAULT_OUTPUT, RESULTS_DIR, FILE_FORMAT,
-    MODE_OPEN_FILE
+    MODE_OPEN_FILE, FLUSH_ROWS, MODE_OPEN_TEXT, OUTPUT_CSV_GZIP,
+    OUTPUT_CSV_ZSTD, OUTPUT_JSONL, OUTPUT_PARQUET, OUTPUT_DB, MODE_PEP
 )
+from profiler import profiler
+from store import close_run, open_run
 
 DOWNLOAD_RESULT = 'Файл с результатами был сохранён: {path}'
+DB_RESULT = 'Результаты сохранены в базу, запуск {run_id}'
+STATUS_CHANGED = 'Статус {url} изменился: {previous} -> {current}'
+MISSING_MODULE = 'Для вывода {output} установите пакет {module}'
+PARQUET_DEFAULT_TYPE = 'string'
+PARQUET_TYPES = {
+    'pep': ('string', 'int64'),
+    'merge': ('string', 'int64'),
+    'search': ('string', 'string', 'float64'),
+    'crawl': ('string', 'int64', 'int64'),
+}
 
 
 def default_output(results, cli_args=''):
-    for row in results:
-        print(*row)
+    for number, row in enumerate(results, 1):
+        print(*row, flush=number % FLUSH_ROWS == 0)
 
 
 def pretty_output(results, cli_args=''):
+    from prettytable import PrettyTable
+    rows = iter(results)
     table = PrettyTable()
-    table.field_names = results[0]
+    table.field_names = next(rows)
     table.align = 'l'
-    table.add_rows(results[1:])
+    table.add_rows(list(rows))
     print(table)
 
 
-def file_output(results, cli_args):
+def get_file_path(cli_args, extension):
     results_dir = BASE_DIR / RESULTS_DIR
     results_dir.mkdir(exist_ok=True)
     parser_mode = cli_args.mode
     now_formatted = dt.datetime.now().strftime(DATETIME_FORMAT)
-    file_name = f'{parser_mode}_{now_formatted}.{FILE_FORMAT}'
-    file_path = results_dir / file_name
+    file_name = f'{parser_mode}_{now_formatted}.{extension}'
+    return results_dir / file_name
+
+
+def write_csv(file, results):
+    writer = csv.writer(file, dialect=csv.unix_dialect)
+    for number, row in enumerate(results, 1):
+        writer.writerow(row)
+        if number % FLUSH_ROWS == 0:
+            file.flush()
+
+
+def batches(rows):
+    while True:
+        batch = list(islice(rows, FLUSH_ROWS))
+        if not batch:
+            return
+        yield batch
+
+
+def file_output(results, cli_args):
+    rows = iter(results)
+    header = next(rows)
+    file_path = get_file_path(cli_args, FILE_FORMAT)
     with open(file_path, MODE_OPEN_FILE, encoding=CODE_PAGES) as file:
-        csv.writer(
-            file,
-            dialect=csv.unix_dialect
-        ).writerows(
-            results
-        )
+        write_csv(file, chain([header], rows))
     logging.info(DOWNLOAD_RESULT.format(path=file_path))
 
 
+def csv_gzip_output(results, cli_args):
+    rows = iter(results)
+    header = next(rows)
+    file_path = get_file_path(cli_args, OUTPUT_CSV_GZIP)
+    with gzip.open(file_path, MODE_OPEN_TEXT, encoding=CODE_PAGES) as file:
+        write_csv(file, chain([header], rows))
+    logging.info(DOWNLOAD_RESULT.format(path=file_path))
+
+
+def csv_zstd_output(results, cli_args):
+    try:
+        import zstandard
+    except ImportError as error:
+        raise ImportError(
+            MISSING_MODULE.format(module='zstandard', output=OUTPUT_CSV_ZSTD)
+        ) from error
+    rows = iter(results)
+    header = next(rows)
+    file_path = get_file_path(cli_args, OUTPUT_CSV_ZSTD)
+    with zstandard.open(
+        file_path, MODE_OPEN_TEXT, encoding=CODE_PAGES
+    ) as file:
+        write_csv(file, chain([header], rows))
+    logging.info(DOWNLOAD_RESULT.format(path=file_path))
+
+
+def jsonl_output(results, cli_args):
+    rows = iter(results)
+    header = next(rows)
+    file_path = get_file_path(cli_args, OUTPUT_JSONL)
+    with open(file_path, MODE_OPEN_FILE, encoding=CODE_PAGES) as file:
+        for batch in batches(rows):
+            file.writelines(
+                json.dumps(dict(zip(header, row)), ensure_ascii=False) + '\n'
+                for row in batch
+            )
+            file.flush()
+    logging.info(DOWNLOAD_RESULT.format(path=file_path))
+
+
+def parquet_schema(pyarrow, mode, header):
+    types = chain(PARQUET_TYPES.get(mode, ()), repeat(PARQUET_DEFAULT_TYPE))
+    return pyarrow.schema([
+        (name, getattr(pyarrow, type_name)())
+        for name, type_name in zip(header, types)
+    ])
+
+
+def parquet_output(results, cli_args):
+    try:
+        import pyarrow
+        from pyarrow import parquet
+    except ImportError as error:
+        raise ImportError(
+            MISSING_MODULE.format(module='pyarrow', output=OUTPUT_PARQUET)
+        ) from error
+    rows = iter(results)
+    header = next(rows)
+    schema = parquet_schema(pyarrow, cli_args.mode, header)
+    file_path = get_file_path(cli_args, OUTPUT_PARQUET)
+    writer = parquet.ParquetWriter(file_path, schema)
+    try:
+        for batch in batches(rows):
+            writer.write_table(pyarrow.Table.from_pylist(
+                [dict(zip(header, row)) for row in batch], schema=schema
+            ))
+    finally:
+        writer.close()
+    logging.info(DOWNLOAD_RESULT.format(path=file_path))
+
+
+def db_output(results, cli_args):
+    rows = iter(results)
+    next(rows)
+    rows = list(rows)
+    store, run_id = open_run(cli_args)
+    store.add_rows(run_id, cli_args.mode, rows)
+    if cli_args.mode == MODE_PEP:
+        for url, previous, current in store.status_changes(run_id):
+            logging.info(STATUS_CHANGED.format(
+                url=url, previous=previous, current=current
+            ))
+    close_run(cli_args, commit=True)
+    logging.info(DB_RESULT.format(run_id=run_id))
+
+
 OUTPUT_NAMES = {
     OUTPUT_PRETTY: pretty_output,
     OUTPUT_FILE: file_output,
+    OUTPUT_CSV_GZIP: csv_gzip_output,
+    OUTPUT_CSV_ZSTD: csv_zstd_output,
+    OUTPUT_JSONL: jsonl_output,
+    OUTPUT_PARQUET: parquet_output,
+    OUTPUT_DB: db_output,
     DEFAULT_OUTPUT: default_output
 }
 
 
+@profiler.timed_writer('control_output')
 def control_output(results, cli_args):
     OUTPUT_NAMES[cli_args.output](results, cli_args)
@@ -0,0 +1,82 @@
+import hashlib
+import inspect
+import json
+import sqlite3
+
+CREATE_TABLE = (
+    'CREATE TABLE IF NOT EXISTS parsed ('
+    'url TEXT, parser TEXT, version TEXT, digest TEXT, fields TEXT, '
+    'PRIMARY KEY (url, parser))'
+)
+SELECT_FIELDS = (
+    'SELECT fields FROM parsed '
+    'WHERE url = ? AND parser = ? AND version = ? AND digest = ?'
+)
+INSERT_FIELDS = 'INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?, ?)'
+DELETE_ALL = 'DELETE FROM parsed'
+
+
+class ParsedCache:
+    """Кеш полей, извлечённых со страниц, по адресу и хешу содержимого.
+
+    Версия записи — хеш исходного кода функции разбора, поэтому
+    изменение селектора в ней делает старые записи недействительными.
+    Каждая запись фиксируется сразу, чтобы режимы, запущенные
+    одновременно, не ждали друг друга на блокировке базы.
+    """
+
+    def __init__(self, path):
+        path.parent.mkdir(exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(CREATE_TABLE)
+        self.versions = {}
+
+    def version(self, parse):
+        if parse not in self.versions:
+            source = getattr(parse, 'source', None) or inspect.getsource(parse)
+            source = source.encode()
+            self.versions[parse] = hashlib.sha256(source).hexdigest()
+        return self.versions[parse]
+
+    @staticmethod
+    def digest(content):
+        return hashlib.sha256(content).hexdigest()
+
+    def get(self, parse, url, digest):
+        row = self.connection.execute(
+            SELECT_FIELDS,
+            (url, parse.__name__, self.version(parse), digest)
+        ).fetchone()
+        if row is None:
+            return None
+        fields = json.loads(row[0])
+        return tuple(fields) if isinstance(fields, list) else fields
+
+    def put(self, parse, url, digest, fields):
+        with self.connection:
+            self.connection.execute(INSERT_FIELDS, (
+                url, parse.__name__, self.version(parse), digest,
+                json.dumps(fields, ensure_ascii=False)
+            ))
+
+    def parse(self, parse, url, content):
+        digest = self.digest(content)
+        fields = self.get(parse, url, digest)
+        if fields is None:
+            fields = parse(content)
+            self.put(parse, url, digest, fields)
+        return fields
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def clear(self):
+        self.connection.execute(DELETE_ALL)
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
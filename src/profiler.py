@@ -0,0 +1,142 @@
+import cProfile
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+from constants import CODE_PAGES, MODE_OPEN_FILE
+
+HEADER_PROFILE = ('Этап', 'Вызовов', 'Всего, с', 'p50, мс', 'p95, мс',
+                  'p99, мс')
+CACHE_RATIO = 'Попаданий в кеш: {hit} из {total} ({ratio:.0%})'
+PERCENTILES = {'p50': 0.5, 'p95': 0.95, 'p99': 0.99}
+
+
+def percentile(ordered, share):
+    return ordered[min(len(ordered) - 1, round(share * (len(ordered) - 1)))]
+
+
+class StageProfiler:
+    """Собирает время работы этапов парсера."""
+
+    def __init__(self):
+        self.enabled = False
+        self.timings = defaultdict(list)
+        self.cache = Counter()
+
+    def timed(self, stage):
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.timings[stage].append(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def timed_writer(self, stage):
+        """Как timed, но без времени, за которое писатель получает строки.
+
+        Первый аргумент функции — строки результата. Если это генератор
+        режима, то их получение — это загрузка и разбор страниц, и это
+        время в замер этапа не входит.
+        """
+        def decorator(function):
+            @wraps(function)
+            def wrapper(rows, *args, **kwargs):
+                if not self.enabled:
+                    return function(rows, *args, **kwargs)
+                pulled = [0.0]
+                start = time.perf_counter()
+                try:
+                    return function(
+                        self.pulling(rows, pulled), *args, **kwargs
+                    )
+                finally:
+                    self.timings[stage].append(
+                        time.perf_counter() - start - pulled[0]
+                    )
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def pulling(rows, pulled):
+        rows = iter(rows)
+        while True:
+            start = time.perf_counter()
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            finally:
+                pulled[0] += time.perf_counter() - start
+            yield row
+
+    def cache_lookup(self, response):
+        if self.enabled:
+            self.cache[
+                'hit' if getattr(response, 'from_cache', False) else 'miss'
+            ] += 1
+
+    def report(self):
+        stages = {}
+        for stage, timings in self.timings.items():
+            ordered = sorted(timings)
+            stages[stage] = {
+                'count': len(ordered),
+                'total': sum(ordered),
+                **{
+                    name: percentile(ordered, share)
+                    for name, share in PERCENTILES.items()
+                },
+            }
+        return {'stages': stages, 'cache': dict(self.cache)}
+
+    def print_report(self):
+        from prettytable import PrettyTable
+        report = self.report()
+        table = PrettyTable()
+        table.field_names = HEADER_PROFILE
+        table.align = 'l'
+        for stage, stats in report['stages'].items():
+            table.add_row((
+                stage, stats['count'], f'{stats["total"]:.3f}',
+                *(f'{stats[name] * 1000:.2f}' for name in PERCENTILES)
+            ))
+        print(table)
+        total = sum(self.cache.values())
+        if total:
+            print(CACHE_RATIO.format(
+                hit=self.cache['hit'], total=total,
+                ratio=self.cache['hit'] / total
+            ))
+
+    def save_report(self, path):
+        with open(path, MODE_OPEN_FILE, encoding=CODE_PAGES) as file:
+            json.dump(self.report(), file, ensure_ascii=False, indent=4)
+
+
+profiler = StageProfiler()
+
+
+@contextmanager
+def profile(cli_args):
+    profiler.enabled = bool(cli_args.profile or cli_args.profile_json)
+    stats = cProfile.Profile() if cli_args.cprofile else None
+    if stats is not None:
+        stats.enable()
+    try:
+        yield profiler
+    finally:
+        if stats is not None:
+            stats.disable()
+            stats.dump_stats(cli_args.cprofile)
+        if cli_args.profile:
+            profiler.print_report()
+        if cli_args.profile_json:
+            profiler.save_report(cli_args.profile_json)
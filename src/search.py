@@ -0,0 +1,174 @@
+import array
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import re
+from collections import Counter
+from operator import itemgetter
+
+from constants import (
+    CODE_PAGES, INDEX_FILE, MODE_DOWNLOAD, POSTINGS_FILE, SEARCH_LIMIT
+)
+from state import load_state, save_state
+from utils import compile_xpath
+
+TOKEN = re.compile(r'\w{2,}')
+POSTING_TYPE = 'I'
+XPATH_NOT_TEXT = '//script|//style'
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+def page_text(content):
+    from lxml import html as lxml_html
+    tree = lxml_html.document_fromstring(
+        content, parser=lxml_html.HTMLParser(encoding=CODE_PAGES)
+    )
+    for element in compile_xpath(XPATH_NOT_TEXT)(tree):
+        element.drop_tree()
+    return (tree.findtext('.//title') or '').strip(), ' '.join(tree.itertext())
+
+
+class SearchIndex:
+    """Инвертированный индекс страниц на диске.
+
+    Словарь терминов хранит для каждого термина смещение и длину его
+    списка в файле postings — массиве пар (номер страницы, частота),
+    который читается через mmap без разбора. При обновлении заново
+    разбираются только страницы с изменившимся хешем содержимого.
+    """
+
+    def __init__(self, path):
+        self.index_path = path / INDEX_FILE
+        self.postings_path = path / POSTINGS_FILE
+        self.map = None
+        self.load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def load(self):
+        state = load_state(self.index_path, {})
+        size = (
+            self.postings_path.stat().st_size
+            if self.postings_path.exists() else 0
+        )
+        if state.get('postings_size') != size:
+            state, size = {}, 0
+        self.docs = state.get('docs', [])
+        self.terms = state.get('terms', {})
+        self.postings = memoryview(b'').cast(POSTING_TYPE)
+        if size:
+            with open(self.postings_path, 'rb') as postings:
+                self.map = mmap.mmap(
+                    postings.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            self.postings = memoryview(self.map).cast(POSTING_TYPE)
+
+    def close(self):
+        self.postings.release()
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    def postings_of(self, term):
+        offset, count = self.terms.get(term, (0, 0))
+        return self.postings[2 * offset:2 * (offset + count)]
+
+    def forward(self):
+        counters = [Counter() for _ in self.docs]
+        for term in self.terms:
+            postings = self.postings_of(term)
+            for doc_id, frequency in zip(postings[::2], postings[1::2]):
+                counters[doc_id][term] = frequency
+        return counters
+
+    def update(self, pages):
+        """Обновляет индекс по парам (адрес, содержимое).
+
+        Для страниц, которые не удалось загрузить, передаётся None —
+        они остаются в индексе в прежнем виде. Страницы, которых нет
+        среди переданных, из индекса удаляются.
+        """
+        known = {doc[0]: doc_id for doc_id, doc in enumerate(self.docs)}
+        forward = None
+        docs, counters, updated = [], [], 0
+        for url, content in pages:
+            doc_id = known.get(url)
+            digest = None if content is None else (
+                hashlib.sha256(content).hexdigest()
+            )
+            if doc_id is not None and digest in (None, self.docs[doc_id][2]):
+                if forward is None:
+                    forward = self.forward()
+                docs.append(self.docs[doc_id])
+                counters.append(forward[doc_id])
+                continue
+            if content is None:
+                continue
+            title, text = page_text(content)
+            tokens = tokenize(text)
+            docs.append([url, title, digest, len(tokens)])
+            counters.append(Counter(tokens))
+            updated += 1
+        if updated or len(docs) != len(self.docs):
+            self.write(docs, counters)
+        return updated
+
+    def write(self, docs, counters):
+        postings = {}
+        for doc_id, counter in enumerate(counters):
+            for term, frequency in counter.items():
+                postings.setdefault(term, []).extend((doc_id, frequency))
+        data = array.array(POSTING_TYPE)
+        terms = {}
+        for term in sorted(postings):
+            terms[term] = [len(data) // 2, len(postings[term]) // 2]
+            data.extend(postings[term])
+        self.close()
+        self.postings_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.postings_path.with_name(
+            self.postings_path.name + '.tmp'
+        )
+        with open(temp_path, MODE_DOWNLOAD) as file:
+            data.tofile(file)
+        os.replace(temp_path, self.postings_path)
+        save_state(self.index_path, {
+            'docs': docs,
+            'terms': terms,
+            'postings_size': len(data) * data.itemsize,
+        })
+        self.load()
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Ранжирует страницы по запросу формулой BM25."""
+        if not self.docs:
+            return []
+        average = sum(doc[3] for doc in self.docs) / len(self.docs) or 1
+        scores = Counter()
+        for term in set(tokenize(query)):
+            postings = self.postings_of(term)
+            count = len(postings) // 2
+            if not count:
+                continue
+            idf = math.log(1 + (len(self.docs) - count + 0.5) / (count + 0.5))
+            for doc_id, frequency in zip(postings[::2], postings[1::2]):
+                norm = 1 - BM25_B + BM25_B * self.docs[doc_id][3] / average
+                scores[doc_id] += idf * frequency * (BM25_K1 + 1) / (
+                    frequency + BM25_K1 * norm
+                )
+        return [
+            (self.docs[doc_id][0], self.docs[doc_id][1], round(score, 3))
+            for doc_id, score in heapq.nlargest(
+                limit, scores.items(), key=itemgetter(1)
+            )
+        ]
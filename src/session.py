@@ -0,0 +1,115 @@
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+import requests
+import requests_cache
+
+from constants import (
+    BASE_DIR, CACHE_ACCESS_FILE, CACHE_MEMORY, EVICT_RATIO, NO_CACHE_HEADER,
+    STATE_DIR
+)
+from state import load_state, save_state
+
+
+class ParserSession(requests_cache.CachedSession):
+    """Кеширующая сессия с общими запросами и ограничением размера кеша."""
+
+    def __init__(self, *args, max_size=None, timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_size = max_size
+        self.timeout = timeout
+        self.persistent = kwargs.get('backend') != CACHE_MEMORY
+        self.accessed = {}
+        self.mirror = None
+        self.in_flight = {}
+        self.in_flight_lock = threading.Lock()
+        self.evict_lock = threading.Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        if method.upper() != 'GET' or args or kwargs.get('stream'):
+            return super().request(method, url, *args, **kwargs)
+        return self.shared_request(method, url, **kwargs)
+
+    def shared_request(self, method, url, **kwargs):
+        """Одинаковые одновременные запросы получают один и тот же ответ."""
+        key = (url, repr(sorted(kwargs.items())))
+        with self.in_flight_lock:
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self.in_flight[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            response = super().request(method, url, **kwargs)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            with self.in_flight_lock:
+                del self.in_flight[key]
+
+    def send(self, request, **kwargs):
+        if request.headers.pop(NO_CACHE_HEADER, None):
+            return requests.Session.send(self, request, **kwargs)
+        response = super().send(request, **kwargs)
+        self.accessed[self.cache.create_key(request)] = time.time()
+        return response
+
+    def cache_size(self):
+        if hasattr(self.cache, 'db_path'):
+            return Path(self.cache.db_path).stat().st_size
+        if hasattr(self.cache, 'cache_dir'):
+            return sum(
+                path.stat().st_size for path in self.cache.cache_dir.iterdir()
+            )
+        return 0
+
+    def evict(self):
+        with self.evict_lock:
+            self.evict_oldest()
+
+    def evict_oldest(self):
+        access_path = BASE_DIR / STATE_DIR / CACHE_ACCESS_FILE
+        accessed = {**load_state(access_path, {}), **self.accessed}
+        if self.max_size is not None and self.cache_size() > self.max_size:
+            self.evict_keys(accessed)
+        cached = set(self.cache.responses.keys())
+        save_state(access_path, {
+            key: accessed_at for key, accessed_at in accessed.items()
+            if key in cached
+        })
+
+    def evict_keys(self, accessed):
+        responses = sorted(
+            (
+                accessed.get(response.cache_key,
+                             response.created_at.timestamp()),
+                response.cache_key,
+                response.size
+            )
+            for response in self.cache.filter()
+        )
+        total = sum(size for _, _, size in responses)
+        evicted = []
+        for _, key, size in responses:
+            if total <= self.max_size * EVICT_RATIO:
+                break
+            evicted.append(key)
+            total -= size
+        self.cache.delete(*evicted)
+        if hasattr(self.cache.responses, 'vacuum'):
+            self.cache.responses.vacuum()
+
+    def close(self):
+        if self.mirror is not None:
+            self.mirror.close()
+        if self.persistent:
+            self.evict()
+        super().close()
@@ -0,0 +1,96 @@
+from utils import find_links, find_texts
+
+
+def has_class(name):
+    return f'contains(concat(" ", @class, " "), " {name} ")'
+
+
+def ends_with(attribute, suffix):
+    return (
+        f'substring({attribute}, string-length({attribute}) - '
+        f'{len(suffix) - 1}) = "{suffix}"'
+    )
+
+
+class Spec:
+    """Описание того, что извлекать со страницы.
+
+    Режим объявляет спецификацию один раз; выражения компилируются
+    при первом применении и переиспользуются для всех страниц.
+    Спецификацию можно передавать в `parse_all` как функцию разбора,
+    а её описание служит версией записей в кеше разобранных страниц.
+    """
+
+    def __init__(self, name):
+        self.__name__ = name
+
+    @property
+    def source(self):
+        return repr(self)
+
+    def __call__(self, content):
+        return self.extract(content)
+
+
+class LinksSpec(Spec):
+    """Ссылки страницы: пары адрес и текст по выражению XPath."""
+
+    def __init__(self, name, xpath):
+        super().__init__(name)
+        self.xpath = xpath
+
+    def __repr__(self):
+        return f'LinksSpec({self.__name__!r}, {self.xpath!r})'
+
+    def extract(self, content):
+        return find_links(content, self.xpath)
+
+
+class TextsSpec(Spec):
+    """Тексты первых вхождений тегов, по одному на поле."""
+
+    def __init__(self, name, fields, single_line=()):
+        super().__init__(name)
+        self.fields = fields
+        self.single_line = single_line
+
+    def __repr__(self):
+        return (
+            f'TextsSpec({self.__name__!r}, {self.fields!r}, '
+            f'{self.single_line!r})'
+        )
+
+    def extract(self, content):
+        texts = find_texts(content, *self.fields.values())
+        return tuple(
+            text.replace('\n', '') if field in self.single_line else text
+            for field, text in zip(self.fields, texts)
+        )
+
+
+WHATS_NEW_LINKS = LinksSpec(
+    'whats_new_links',
+    f'//*[@id="what-s-new-in-python"]//div[{has_class("toctree-wrapper")}]'
+    f'//li[{has_class("toctree-l1")}]//a[{ends_with("@href", ".html")}]'
+)
+WHATS_NEW_PAGE = TextsSpec(
+    'whats_new_fields', {'title': 'h1', 'editors': 'dl'},
+    single_line=('editors',)
+)
+VERSION_LINKS = LinksSpec(
+    'version_links',
+    f'(//div[{has_class("sphinxsidebarwrapper")}]'
+    '//ul[contains(., "All versions")])[1]//a'
+)
+PEP_LINKS = LinksSpec(
+    'pep_links',
+    f'//*[@id="numerical-index"]//a[{has_class("pep")} and '
+    f'{has_class("reference")} and {has_class("internal")}]'
+)
+CRAWL_LINKS = LinksSpec('crawl_links', '//a[@href]')
+PEP_PAGE = TextsSpec('pep_status', {'status': 'abbr'})
+DOWNLOAD_LINKS = LinksSpec(
+    'download_links',
+    f'//div//table[{has_class("docutils")}]'
+    f'//a[{ends_with("@href", "a4.zip")}]'
+)
@@ -0,0 +1,52 @@
+import json
+import os
+
+from constants import CHECKPOINT_EVERY, CODE_PAGES, MODE_OPEN_FILE
+
+
+def load_state(path, default=None):
+    if not path.exists():
+        return default
+    with open(path, encoding=CODE_PAGES) as file:
+        return json.load(file)
+
+
+def save_state(path, state):
+    path.parent.mkdir(exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, MODE_OPEN_FILE, encoding=CODE_PAGES) as file:
+        json.dump(state, file, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+class Checkpoint:
+    """Результаты уже обработанных адресов для продолжения после сбоя.
+
+    Сохраняется атомарно каждые `every` адресов; без `resume`
+    начинается с пустого состояния.
+    """
+
+    def __init__(self, path, resume=False, every=CHECKPOINT_EVERY):
+        self.path = path
+        self.every = every
+        self.done = load_state(path, {}).get('done', {}) if resume else {}
+        self.unsaved = 0
+
+    def __contains__(self, url):
+        return url in self.done
+
+    def remaining(self, urls):
+        return [url for url in urls if url not in self.done]
+
+    def add(self, url, result):
+        self.done[url] = result
+        self.unsaved += 1
+        if self.unsaved >= self.every:
+            self.save()
+
+    def save(self):
+        save_state(self.path, {'done': self.done})
+        self.unsaved = 0
+
+    def complete(self):
+        self.path.unlink(missing_ok=True)
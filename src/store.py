@@ -0,0 +1,171 @@
+import datetime as dt
+import sqlite3
+
+from constants import BASE_DIR, RESULTS_DB
+
+CREATE_TABLES = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY, mode TEXT NOT NULL, started_at TEXT NOT NULL,
+    key TEXT
+);
+CREATE TABLE IF NOT EXISTS whats_new (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    link TEXT, title TEXT, editors TEXT
+);
+CREATE TABLE IF NOT EXISTS latest_versions (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    link TEXT, version TEXT, status TEXT
+);
+CREATE TABLE IF NOT EXISTS pep_counts (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    status TEXT, count INTEGER
+);
+CREATE TABLE IF NOT EXISTS pep_statuses (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    url TEXT, status TEXT
+);
+CREATE TABLE IF NOT EXISTS search_results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    link TEXT, title TEXT, score REAL
+);
+CREATE TABLE IF NOT EXISTS crawl_pages (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    link TEXT, status INTEGER, depth INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_mode ON runs (mode, id);
+CREATE INDEX IF NOT EXISTS whats_new_run ON whats_new (run_id, link);
+CREATE INDEX IF NOT EXISTS latest_versions_run
+    ON latest_versions (run_id, version);
+CREATE INDEX IF NOT EXISTS pep_counts_run ON pep_counts (run_id, status);
+CREATE INDEX IF NOT EXISTS pep_statuses_run ON pep_statuses (run_id, url);
+'''
+MODE_TABLES = {
+    'whats-new': ('whats_new', ('link', 'title', 'editors')),
+    'latest-versions': ('latest_versions', ('link', 'version', 'status')),
+    'pep': ('pep_counts', ('status', 'count')),
+    'search': ('search_results', ('link', 'title', 'score')),
+    'crawl': ('crawl_pages', ('link', 'status', 'depth')),
+    'merge': ('pep_counts', ('status', 'count')),
+}
+SELECT_RUN_COLUMNS = 'SELECT name FROM pragma_table_info(\'runs\')'
+ADD_RUN_KEY = 'ALTER TABLE runs ADD COLUMN key TEXT'
+RUN_KEY = '{mode}-{shard}-of-{shards}'
+INSERT_RUN = 'INSERT INTO runs (mode, started_at, key) VALUES (?, ?, ?)'
+INSERT_ROWS = 'INSERT INTO {table} (run_id, {columns}) VALUES (?, {values})'
+INSERT_PEP_STATUSES = (
+    'INSERT INTO pep_statuses (run_id, url, status) VALUES (?, ?, ?)'
+)
+SELECT_LAST_RUN = 'SELECT MAX(run_id) FROM pep_statuses'
+SELECT_PREVIOUS_RUN = '''
+SELECT MAX(pep_statuses.run_id)
+FROM pep_statuses JOIN runs ON runs.id = pep_statuses.run_id
+WHERE pep_statuses.run_id < ?
+    AND runs.key IS (SELECT key FROM runs WHERE id = ?)
+'''
+SELECT_STATUS_CHANGES = '''
+SELECT current.url, previous.status, current.status
+FROM pep_statuses AS current
+LEFT JOIN pep_statuses AS previous
+    ON previous.url = current.url AND previous.run_id = ?
+WHERE current.run_id = ?
+    AND previous.status IS NOT current.status
+ORDER BY current.url
+'''
+
+
+class ResultStore:
+    """Хранилище результатов парсера в SQLite с историей запусков.
+
+    Запуск, его статусы и строки записываются в одной транзакции:
+    они фиксируются вызовом commit, а при закрытии без него
+    отбрасываются.
+    """
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(CREATE_TABLES)
+        columns = {
+            name for name, in self.connection.execute(SELECT_RUN_COLUMNS)
+        }
+        if 'key' not in columns:
+            self.connection.execute(ADD_RUN_KEY)
+
+    def start_run(self, mode, key=None):
+        return self.connection.execute(
+            INSERT_RUN, (mode, dt.datetime.now().isoformat(), key)
+        ).lastrowid
+
+    def add_rows(self, run_id, mode, rows):
+        table, columns = MODE_TABLES[mode]
+        self.connection.executemany(
+            INSERT_ROWS.format(
+                table=table, columns=', '.join(columns),
+                values=', '.join('?' * len(columns))
+            ),
+            ((run_id, *row) for row in rows)
+        )
+
+    def add_pep_statuses(self, run_id, statuses):
+        self.connection.executemany(
+            INSERT_PEP_STATUSES,
+            ((run_id, url, status) for url, status in statuses)
+        )
+
+    def status_changes(self, run_id=None):
+        """Статусы PEP, изменившиеся с прошлого запуска с тем же ключом.
+
+        Запуски разных частей (--shard) сравниваются только между собой.
+        Без run_id берётся последний запуск со статусами.
+        """
+        if run_id is None:
+            run_id, = self.connection.execute(SELECT_LAST_RUN).fetchone()
+        previous, = self.connection.execute(
+            SELECT_PREVIOUS_RUN, (run_id, run_id)
+        ).fetchone()
+        if previous is None:
+            return []
+        return self.connection.execute(
+            SELECT_STATUS_CHANGES, (previous, run_id)
+        ).fetchall()
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+def run_key(cli_args):
+    shard = getattr(cli_args, 'shard', None)
+    if shard is None:
+        return cli_args.mode
+    return RUN_KEY.format(mode=cli_args.mode, shard=shard[0], shards=shard[1])
+
+
+def open_run(cli_args):
+    if getattr(cli_args, 'result_run', None) is None:
+        store = ResultStore(BASE_DIR / RESULTS_DB)
+        cli_args.result_run = store, store.start_run(
+            cli_args.mode, run_key(cli_args)
+        )
+    return cli_args.result_run
+
+
+def close_run(cli_args, commit=False):
+    if getattr(cli_args, 'result_run', None) is None:
+        return
+    store, _ = cli_args.result_run
+    if commit:
+        store.commit()
+    store.close()
+    cli_args.result_run = None
+
+
+def record_pep_statuses(statuses, cli_args):
+    recorded = []
+    for pep_url, status, error in statuses:
+        if error is None:
+            recorded.append((pep_url, status))
+        yield pep_url, status, error
+    store, run_id = open_run(cli_args)
+    store.add_pep_statuses(run_id, recorded)
@@ -1,28 +1,427 @@
-from bs4 import BeautifulSoup
+import codecs
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import (
+    Future, ProcessPoolExecutor, ThreadPoolExecutor
+)
+from functools import partial
+from io import BytesIO
+
 from requests import RequestException
 
-from constants import CODE_PAGES
-from exceptions import ParserFindTagException
+from constants import (
+    CHUNK_SIZE, CODE_PAGES, ETAG_SUFFIX, MODE_DOWNLOAD, MODE_RESUME,
+    NO_CACHE_HEADER, PARSE_WINDOW
+)
+from exceptions import DownloadCheckException, ParserFindTagException
+from profiler import profiler
 
 ERROR_PAGE = 'Возникла ошибка при загрузке страницы {url} {error}'
 ERROR_TAG = 'Не найден тег {tag} {attrs}'
+ERROR_RANGE = 'Сервер не поддерживает загрузку частями: {url}'
+ERROR_SIZE = 'Размер файла {path} {size} байт, ожидалось {length}'
+ERROR_CHECKSUM = 'Контрольная сумма файла {path} не совпадает'
+ERROR_JSON = 'Некорректный JSON-объект в позиции {position}'
+JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+XPATH_STRING = 'string()'
+XPATHS = threading.local()
+
+
+def offline_mirror(session):
+    mirror = getattr(session, 'mirror', None)
+    return mirror if mirror is not None and mirror.offline else None
+
+
+@profiler.timed('get_response')
+def get_response(session, url, encode=CODE_PAGES, stream=False):
+    mirror = getattr(session, 'mirror', None)
+    if mirror is not None and mirror.offline:
+        response = mirror.response(url)
+    else:
+        try:
+            response = session.get(
+                url, stream=stream,
+                headers=without_cache(session) if stream else None
+            )
+        except RequestException as error:
+            raise ConnectionError(ERROR_PAGE.format(url=url, error=error))
+        if mirror is not None:
+            mirror.add(url, response.content)
+    profiler.cache_lookup(response)
+    response.encoding = encode
+    return response
 
 
-def get_response(session, url, encode=CODE_PAGES):
+@profiler.timed('get_if_changed')
+def get_if_changed(session, url, validators=None):
+    headers = {}
+    if validators and validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators and validators.get('modified'):
+        headers['If-Modified-Since'] = validators['modified']
+    mirror = offline_mirror(session)
     try:
-        response = session.get(url)
-        response.encoding = encode
-        return response
+        response = (
+            mirror.response(url) if mirror is not None
+            else session.get(url, headers=without_cache(session, headers))
+        )
     except RequestException as error:
         raise ConnectionError(ERROR_PAGE.format(url=url, error=error))
+    profiler.cache_lookup(response)
+    response.encoding = CODE_PAGES
+    return response
+
+
+def get_validators(response):
+    return {
+        'etag': response.headers.get('ETag'),
+        'modified': response.headers.get('Last-Modified'),
+        'hash': hashlib.sha256(response.content).hexdigest(),
+    }
+
+
+def get_content(session, url):
+    return get_response(session, url).content
 
 
+def progress_bar(iterable=None, **kwargs):
+    from tqdm import tqdm
+    return tqdm(iterable, **kwargs)
+
+
+@profiler.timed('get_soup')
 def get_soup(session, url, feature='lxml'):
+    from bs4 import BeautifulSoup
     return BeautifulSoup(get_response(session, url).text, feature)
 
 
+@profiler.timed('find_tag')
 def find_tag(soup, tag, attrs=None):
     searched_tag = soup.find(tag, attrs=(attrs or {}))
     if searched_tag is None:
         raise ParserFindTagException(ERROR_TAG.format(tag=tag, attrs=attrs))
     return searched_tag
+
+
+def compile_xpath(xpath):
+    """Компилирует выражение XPath один раз на поток.
+
+    Скомпилированное выражение lxml защищено блокировкой, поэтому
+    у каждого потока свой экземпляр.
+    """
+    if not hasattr(XPATHS, 'compiled'):
+        XPATHS.compiled = {}
+    if xpath not in XPATHS.compiled:
+        from lxml import etree
+        XPATHS.compiled[xpath] = etree.XPath(xpath)
+    return XPATHS.compiled[xpath]
+
+
+@profiler.timed('find_texts')
+def find_texts(content, *tags):
+    from lxml import etree
+    first = {}
+    texts = {}
+    for event, element in etree.iterparse(
+        BytesIO(content), events=('start', 'end'), tag=tags, html=True,
+        encoding=CODE_PAGES
+    ):
+        if event == 'start':
+            first.setdefault(element.tag, element)
+        elif first[element.tag] is element:
+            texts[element.tag] = str(compile_xpath(XPATH_STRING)(element))
+            if len(texts) == len(tags):
+                return tuple(texts[tag] for tag in tags)
+    missing = [tag for tag in tags if tag not in texts]
+    raise ParserFindTagException(ERROR_TAG.format(tag=missing[0], attrs=None))
+
+
+@profiler.timed('find_links')
+def find_links(content, xpath):
+    from lxml import html as lxml_html
+    tree = lxml_html.document_fromstring(
+        content, parser=lxml_html.HTMLParser(encoding=CODE_PAGES)
+    )
+    text = compile_xpath(XPATH_STRING)
+    return [
+        (element.get('href'), str(text(element)))
+        for element in compile_xpath(xpath)(tree)
+    ]
+
+
+def skip_whitespace(buffer, position):
+    return JSON_WHITESPACE.match(buffer, position).end()
+
+
+def decode_pair(decoder, buffer, position):
+    try:
+        key, position = decoder.raw_decode(buffer, position)
+        position = skip_whitespace(buffer, position)
+        if buffer[position:position + 1] != ':':
+            return None
+        value, position = decoder.raw_decode(
+            buffer, skip_whitespace(buffer, position + 1)
+        )
+    except json.JSONDecodeError:
+        return None
+    if skip_whitespace(buffer, position) == len(buffer):
+        return None
+    return key, value, position
+
+
+def iter_json_object(chunks):
+    """Разбирает JSON-объект по частям и отдаёт пары ключ-значение.
+
+    Пара отдаётся, как только получена целиком, поэтому весь ответ
+    не держится в памяти.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder(CODE_PAGES)()
+    buffer, position, expected = '', 0, '{'
+    for chunk in chunks:
+        buffer = buffer[position:] + text.decode(chunk)
+        position = 0
+        while True:
+            position = skip_whitespace(buffer, position)
+            if position == len(buffer):
+                break
+            char = buffer[position]
+            if expected in ('{', ',') or char == '}':
+                if char == '}' and expected != '{':
+                    return
+                if char != expected:
+                    raise ValueError(ERROR_JSON.format(position=position))
+                position, expected = position + 1, ''
+                continue
+            pair = decode_pair(decoder, buffer, position)
+            if pair is None:
+                break
+            key, value, position = pair
+            expected = ','
+            yield key, value
+    raise ValueError(ERROR_JSON.format(position=position))
+
+
+def fetch_page(session, url, fetch=get_soup):
+    try:
+        return url, fetch(session, url), None
+    except ConnectionError as error:
+        return url, None, error
+
+
+def fetch_all(session, urls, workers=1, fetch=get_soup):
+    fetch_one = partial(fetch_page, session, fetch=fetch)
+    if workers <= 1:
+        yield from map(fetch_one, urls)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(fetch_one, urls)
+
+
+def submit_parse(executor, parse, cache, url, page, error):
+    if error is not None:
+        return url, None, None, error
+    digest = fields = None
+    if cache is not None:
+        digest = cache.digest(page)
+        fields = cache.get(parse, url, digest)
+    if fields is None:
+        fields = executor.submit(parse, page)
+    return url, fields, digest, error
+
+
+def is_parsed(job):
+    _, fields, _, _ = job
+    return not isinstance(fields, Future) or fields.done()
+
+
+def finish_parse(parse, cache, url, fields, digest, error):
+    if isinstance(fields, Future):
+        fields = fields.result()
+        if cache is not None:
+            cache.put(parse, url, digest, fields)
+    return url, fields, error
+
+
+def parse_all(pages, parse, processes=1, cache=None):
+    """Разбирает страницы по мере загрузки, сохраняя их порядок.
+
+    В пуле процессов одновременно находится не больше
+    processes * PARSE_WINDOW страниц; готовые результаты отдаются
+    сразу, не дожидаясь конца загрузки.
+    """
+    if processes <= 1:
+        for url, page, error in pages:
+            if error is not None:
+                yield url, None, error
+            elif cache is None:
+                yield url, parse(page), error
+            else:
+                yield url, cache.parse(parse, url, page), error
+        return
+    window = deque()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for page in pages:
+            window.append(submit_parse(executor, parse, cache, *page))
+            while window and (
+                len(window) >= processes * PARSE_WINDOW
+                or is_parsed(window[0])
+            ):
+                yield finish_parse(parse, cache, *window.popleft())
+        while window:
+            yield finish_parse(parse, cache, *window.popleft())
+
+
+def without_cache(session, headers=None):
+    """Заголовки запроса, который кеширующая сессия отправит мимо кеша."""
+    headers = dict(headers or {})
+    if hasattr(session, 'cache'):
+        headers[NO_CACHE_HEADER] = 'true'
+    return headers
+
+
+def remote_file_info(session, url):
+    mirror = offline_mirror(session)
+    if mirror is not None:
+        return len(mirror.response(url).content), '', False
+    try:
+        response = session.head(
+            url, allow_redirects=True, headers=without_cache(session)
+        )
+    except RequestException as error:
+        raise ConnectionError(ERROR_PAGE.format(url=url, error=error))
+    length = response.headers.get('Content-Length')
+    return (
+        int(length) if length is not None else None,
+        response.headers.get('ETag', ''),
+        response.headers.get('Accept-Ranges') == 'bytes'
+    )
+
+
+def local_file_info(path):
+    etag_path = path.with_name(path.name + ETAG_SUFFIX)
+    size = path.stat().st_size if path.exists() else 0
+    etag = etag_path.read_text() if etag_path.exists() else ''
+    return size, etag, etag_path
+
+
+def stream_to_file(response, path, mode, total, initial=0):
+    with open(path, mode) as file, progress_bar(
+        total=total, initial=initial, desc=path.name,
+        unit='B', unit_scale=True, unit_divisor=1024
+    ) as progress:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            file.write(chunk)
+            progress.update(len(chunk))
+
+
+def get_stream(session, url, headers=None):
+    mirror = offline_mirror(session)
+    if mirror is not None:
+        return mirror.response(url)
+    try:
+        response = session.get(
+            url, headers=without_cache(session, headers), stream=True
+        )
+        response.raise_for_status()
+    except RequestException as error:
+        raise ConnectionError(ERROR_PAGE.format(url=url, error=error))
+    return response
+
+
+def download_stream(session, url, path, length, size=0, etag=''):
+    headers = {}
+    if 0 < size < (length or 0):
+        headers = {'Range': f'bytes={size}-', 'If-Range': etag}
+    with get_stream(session, url, headers) as response:
+        resumed = response.status_code == 206
+        try:
+            stream_to_file(
+                response, path,
+                MODE_RESUME if resumed else MODE_DOWNLOAD,
+                length, size if resumed else 0
+            )
+        except RequestException as error:
+            raise ConnectionError(ERROR_PAGE.format(url=url, error=error))
+
+
+def split_ranges(length, segments):
+    step = -(-length // segments)
+    return [
+        (start, min(start + step, length) - 1)
+        for start in range(0, length, step)
+    ]
+
+
+def download_segment(session, url, descriptor, progress, byte_range):
+    start, end = byte_range
+    headers = {'Range': f'bytes={start}-{end}'}
+    with get_stream(session, url, headers) as response:
+        if response.status_code != 206:
+            raise DownloadCheckException(ERROR_RANGE.format(url=url))
+        offset = start
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            offset += os.pwrite(descriptor, chunk, offset)
+            progress.update(len(chunk))
+    if offset != end + 1:
+        raise DownloadCheckException(
+            ERROR_SIZE.format(path=url, size=offset - start,
+                              length=end + 1 - start)
+        )
+
+
+def download_segments(session, url, path, length, segments):
+    with open(path, MODE_DOWNLOAD) as file:
+        file.truncate(length)
+    descriptor = os.open(path, os.O_WRONLY)
+    try:
+        with progress_bar(
+            total=length, desc=path.name,
+            unit='B', unit_scale=True, unit_divisor=1024
+        ) as progress, ThreadPoolExecutor(max_workers=segments) as executor:
+            list(executor.map(
+                partial(download_segment, session, url, descriptor, progress),
+                split_ranges(length, segments)
+            ))
+    finally:
+        os.close(descriptor)
+
+
+def check_file(path, length=None, checksum=None):
+    size = path.stat().st_size
+    if length is not None and size != length:
+        raise DownloadCheckException(
+            ERROR_SIZE.format(path=path, size=size, length=length)
+        )
+    if checksum is None:
+        return
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(partial(file.read, CHUNK_SIZE), b''):
+            digest.update(chunk)
+    if digest.hexdigest() != checksum.lower():
+        raise DownloadCheckException(ERROR_CHECKSUM.format(path=path))
+
+
+def download_file(session, url, path, segments=1, checksum=None):
+    length, etag, ranges = remote_file_info(session, url)
+    size, local_etag, etag_path = local_file_info(path)
+    same_file = bool(etag) and etag == local_etag
+    if same_file and size == length:
+        return path
+    if segments > 1 and ranges and length:
+        etag_path.unlink(missing_ok=True)
+        download_segments(session, url, path, length, segments)
+    else:
+        etag_path.write_text(etag)
+        download_stream(
+            session, url, path, length,
+            size if same_file and ranges else 0, etag
+        )
+    check_file(path, length, checksum)
+    etag_path.write_text(etag)
+    return path
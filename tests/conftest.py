@@ -40,6 +40,14 @@ def tempfile_session() -> CachedSession:
     )
 
 
+def pep_index(urls: List[str]) -> str:
+    """Build a PEP numerical index page linking to the given URLs"""
+    return '<section id="numerical-index">' + ''.join(
+        f'<a class="pep reference internal" href="{url}">{url}</a>'
+        for url in urls
+    ) + '</section>'
+
+
 def get_mock_adapter() -> Adapter:
     adapter = Adapter()
     adapter.register_uri(
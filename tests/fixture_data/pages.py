@@ -0,0 +1,42 @@
+pep_page = '''<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>PEP 8</title></head>
+<body><section id="pep-content">
+<h1 class="page-title">PEP 8 – Style Guide for Python Code</h1>
+<dl class="rfc2822 field-list simple">
+<dt class="field-odd">Author<span class="colon">:</span></dt>
+<dd class="field-odd">Guido van Rossum &lt;guido&#32;at&#32;python.org&gt;,
+Łukasz Langa</dd>
+<dt class="field-even">Status<span class="colon">:</span></dt>
+<dd class="field-even"><abbr title="Currently valid">Active</abbr></dd>
+<dt class="field-odd">Type<span class="colon">:</span></dt>
+<dd class="field-odd"><abbr title="Non-normative">Process</abbr></dd>
+</dl></section></body></html>
+'''
+
+whats_new_page = '''<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"></head><body>
+<div class="body" role="main"><section id="what-s-new-in-python-3-10">
+<h1>What’s New In Python 3.10<a class="headerlink" href="#w">¶</a></h1>
+<dl class="field-list simple">
+<dt class="field-odd">Editor<span class="colon">:</span></dt>
+<dd class="field-odd"><p>Pablo Galindo Salgado</p>
+</dd>
+</dl>
+<dl><dt>Other</dt></dl>
+</section></div></body></html>
+'''
+
+main_page = '''<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"></head><body>
+<div class="sphinxsidebar"><div class="sphinxsidebarwrapper">
+<h3>Download</h3>
+<ul><li><a href="download.html">Download these documents</a></li></ul>
+<h3>Docs by version</h3>
+<ul>
+<li><a href="https://docs.python.org/3.13/">Python 3.13 (in development)</a></li>
+<li><a href="https://docs.python.org/3.12/">Python 3.12 (stable)</a></li>
+<li><a href="https://docs.python.org/2.7/">Python 2.7 (EOL)</a></li>
+<li><a href="https://www.python.org/doc/versions/">All versions</a></li>
+</ul>
+</div></div></body></html>
+'''
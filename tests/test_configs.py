@@ -29,7 +29,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'csv.gz', 'csv.zst', 'jsonl', 'parquet', 'db'),
         'Дополнительные способы вывода данных'
     ),
 ])
@@ -64,3 +64,28 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1/3', (1, 3)), ('3/3', (3, 3)), ('0/3', None), ('4/3', None),
+    ('a/b', None),
+])
+def test_shard_argument(value, expected):
+    if expected is None:
+        with pytest.raises(argparse.ArgumentTypeError):
+            configs.shard(value)
+    else:
+        assert configs.shard(value) == expected
+
+
+def test_user_cache_expire_url_wins():
+    patterns = configs.urls_expire_after([('peps.python.org', 60)])
+    assert patterns['peps.python.org'] == 60, (
+        'Время жизни из --cache-expire-url важнее значения по умолчанию'
+    )
+    assert list(patterns)[0] == 'peps.python.org', (
+        'Шаблоны пользователя проверяются раньше шаблонов по умолчанию'
+    )
+    assert patterns['docs.python.org'] == configs.CACHE_EXPIRE_URLS[
+        'docs.python.org'
+    ]
@@ -0,0 +1,86 @@
+from argparse import Namespace
+
+import pytest
+import requests
+import requests_mock
+try:
+    from src import crawler, main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `crawler.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `crawler.py`'
+
+ROOT = 'https://docs.python.org/3/'
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('HTTPS://Docs.Python.org:443/3/index.html#top',
+     'https://docs.python.org/3/'),
+    ('https://docs.python.org/3/library/?b=2&a=1',
+     'https://docs.python.org/3/library/?a=1&b=2'),
+    ('mailto:docs@python.org', None),
+    ('https://docs.python.org:bad/', None),
+])
+def test_normalize_url(url, expected):
+    assert crawler.normalize_url(url) == expected
+
+
+def test_seen_set_grows():
+    seen = crawler.SeenSet(capacity=4)
+    urls = [f'{ROOT}page-{number}.html' for number in range(1_000)]
+    assert all(seen.add(url) for url in urls)
+    assert not seen.add(urls[500]), 'Повторный адрес не должен добавляться'
+    assert len(seen) == 1_000 and urls[999] in seen
+    assert len(seen.slots) <= 4 * 1_000, (
+        'Множество должно хранить хеши адресов компактно'
+    )
+
+
+def test_crawl_stays_in_scope():
+    pages = {
+        ROOT: '<a href="library/">lib</a><a href="tutorial/index.html#x">'
+              'tut</a><a href="https://www.python.org/">out</a>'
+              '<a href="archives/docs.zip">zip</a>',
+        ROOT + 'library/': '<a href="../">up</a><a href="os.html">os</a>',
+        ROOT + 'tutorial/': '<a href="../library/os.html">os</a>',
+        ROOT + 'library/os.html': '<a href="missing.html">missing</a>',
+    }
+    with requests_mock.Mocker() as mock:
+        for url, page in pages.items():
+            mock.get(url, text=page, headers={'Content-Type': 'text/html'})
+        mock.get(ROOT + 'library/missing.html', status_code=404)
+        got = list(main.crawl(requests.Session(), Namespace(workers=3)))
+        assert mock.call_count == 5, (
+            'Каждая страница в пределах документации загружается один раз'
+        )
+    assert got[0] == ('Ссылка', 'Код ответа', 'Глубина')
+    assert sorted(got[1:]) == [
+        (ROOT, 200, 0),
+        (ROOT + 'library/', 200, 1),
+        (ROOT + 'library/missing.html', 404, 3),
+        (ROOT + 'library/os.html', 200, 2),
+        (ROOT + 'tutorial/', 200, 1),
+    ]
+    with requests_mock.Mocker() as mock:
+        for url, page in pages.items():
+            mock.get(url, text=page, headers={'Content-Type': 'text/html'})
+        got = list(main.crawl(
+            requests.Session(), Namespace(max_pages=2, max_depth=None)
+        ))
+    assert len(got) == 3
+
+
+def test_crawl_survives_broken_pages():
+    with requests_mock.Mocker() as mock:
+        mock.get(ROOT, headers={'Content-Type': 'text/html'}, text=(
+            '<a href="empty.html">empty</a><a href="down.html">down</a>'
+        ))
+        mock.get(ROOT + 'empty.html', text='',
+                 headers={'Content-Type': 'text/html'})
+        mock.get(ROOT + 'down.html', exc=requests.ConnectionError)
+        got = list(main.crawl(requests.Session(), Namespace(workers=2)))
+    assert sorted(got[1:], key=str) == sorted([
+        (ROOT, 200, 0),
+        (ROOT + 'down.html', None, 1),
+        (ROOT + 'empty.html', 200, 1),
+    ], key=str), 'Пустая или недоступная страница не прерывает обход'
@@ -0,0 +1,93 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+try:
+    from src import limiter, session
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `limiter.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `limiter.py`'
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.server.requests <= self.server.throttled:
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+    server.requests = 0
+    server.throttled = 2
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+def test_limiter_retries_throttled_requests(server):
+    host_limiter = limiter.HostLimiter(rate=8, burst=1)
+    parser_session = session.ParserSession(backend='memory')
+    parser_session.mount('http://', limiter.RateLimitedAdapter(
+        host_limiter, retries=3, backoff=0
+    ))
+    url = f'http://127.0.0.1:{server.server_address[1]}/pep-0008/'
+    response = parser_session.get(url)
+    assert response.status_code == 200, (
+        'После ответов 429 запрос должен быть повторён'
+    )
+    assert server.requests == 3
+    bucket = host_limiter.bucket(url)
+    assert bucket.rate < 8, 'После ответов 429 скорость должна снижаться'
+    assert parser_session.get(url).from_cache
+    assert server.requests == 3, (
+        'Ответы из кеша не должны проходить через ограничитель'
+    )
+
+
+def test_token_bucket_limits_rate(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(limiter, 'time', SimpleNamespace(
+        monotonic=lambda: clock[0],
+        sleep=lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+    ))
+    bucket = limiter.TokenBucket(rate=2, burst=1)
+    for _ in range(5):
+        bucket.acquire()
+    assert clock[0] == pytest.approx(2), (
+        'Ведро должно пропускать не больше rate запросов в секунду'
+    )
+
+
+def test_token_bucket_unlimited_until_throttled(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(limiter, 'time', SimpleNamespace(
+        monotonic=lambda: clock[0],
+        sleep=lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+    ))
+    bucket = limiter.TokenBucket()
+    for _ in range(100):
+        bucket.acquire()
+    assert clock[0] == 0, 'Без --rate запросы не должны ждать'
+    bucket.throttle(0)
+    throttled = bucket.rate
+    for _ in range(20):
+        bucket.succeed()
+    assert bucket.rate > max(throttled, limiter.THROTTLED_RATE), (
+        'После успешных ответов скорость должна расти выше начальной'
+    )
@@ -1,5 +1,14 @@
+import subprocess
+import sys
+import threading
+
 import pytest
+import requests
+import requests_mock
+from argparse import Namespace
 from pathlib import Path
+from types import SimpleNamespace
+from conftest import pep_index
 try:
     from src import main
 except ModuleNotFoundError:
@@ -31,11 +40,8 @@ def test_main_file():
 
 
 def test_whats_new(mock_session):
-    got = main.whats_new(mock_session)
+    got = list(main.whats_new(mock_session))
     header = ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
-    assert isinstance(got, list), (
-        'Функция `whats_new` должна возвращать объект типа `list`'
-    )
     assert len(got) > 0, (
         'Убедитесь что функция `whats_new` модуля `main.py` '
         'возвращает непустой список'
@@ -53,10 +59,7 @@ def test_whats_new(mock_session):
 
 @pytest.mark.skip()
 def test_latest_versions(mock_session):
-    got = main.latest_versions(mock_session)
-    assert isinstance(got, list), (
-        'Функция `latest_versions` должна возвращать объект типа `list`'
-    )
+    got = list(main.latest_versions(mock_session))
     assert isinstance(got[0], tuple), (
         'Функция `latest_versions` должна вернуть список `result`, '
         'элементами которого должны быть объекты типа `tuple`'
@@ -123,7 +126,10 @@ def test_mode_to_function():
             f'{name_func} - это строка.'
         )
         assert (
-            name_func in ['whats-new', 'latest-versions', 'download', 'pep']
+            name_func in [
+                'whats-new', 'latest-versions', 'download', 'pep', 'mirror',
+                'index', 'search', 'crawl', 'merge'
+            ]
         ), (
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет ключа `{name_func}`'
@@ -134,9 +140,330 @@ def test_mode_to_function():
         )
         assert (
             func.__name__ in [
-                'whats_new', 'latest_versions', 'download', 'pep'
+                'whats_new', 'latest_versions', 'download', 'pep', 'mirror',
+                'index', 'search', 'crawl', 'merge'
             ]
         ), (
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+def test_pep_incremental(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    index = (
+        '<section id="numerical-index">'
+        '<a class="pep reference internal" href="pep-0008/">8</a>'
+        '<a class="pep reference internal" href="pep-0020/">20</a>'
+        '</section>'
+    )
+    pages = {
+        main.PEP_DOC_URL: index,
+        main.PEP_DOC_URL + 'pep-0008/': '<dd><abbr>Active</abbr></dd>',
+        main.PEP_DOC_URL + 'pep-0020/': '<dd><abbr>Final</abbr></dd>',
+    }
+
+    def page(request, context):
+        context.headers['ETag'] = str(hash(pages[request.url]))
+        if request.headers.get('If-None-Match') == context.headers['ETag']:
+            context.status_code = 304
+            return ''
+        return pages[request.url]
+
+    cli_args = Namespace(workers=1, incremental=True)
+    answer = [('Статус', 'Количество'), ('Active', 1), ('Final', 1),
+              ('Итого:', 2)]
+    with requests_mock.Mocker() as mock:
+        for url in pages:
+            mock.get(url, text=page)
+        assert list(main.pep(requests.Session(), cli_args)) == answer
+        assert mock.call_count == 3
+        assert list(main.pep(requests.Session(), cli_args)) == answer
+        assert mock.call_count == 4, (
+            'Если индекс PEP не изменился, страницы PEP не загружаются'
+        )
+        pages[main.PEP_DOC_URL] = index + ' '
+        pages[main.PEP_DOC_URL + 'pep-0008/'] = '<abbr>Withdrawn</abbr>'
+        got = list(main.pep(requests.Session(), cli_args))
+        assert mock.last_request.headers.get('If-None-Match'), (
+            'Неизменившиеся PEP нужно запрашивать условным запросом'
+        )
+    assert got == [('Статус', 'Количество'), ('Withdrawn', 1), ('Final', 1),
+                   ('Итого:', 2)]
+
+
+def test_pep_json_source():
+    index = {
+        '8': {'number': 8, 'status': 'Active',
+              'url': main.PEP_DOC_URL + 'pep-0008/'},
+        '20': {'number': 20, 'status': 'Final',
+               'url': main.PEP_DOC_URL + 'pep-0020/'},
+        '401': {'number': 401, 'status': 'April Fool!',
+                'url': main.PEP_DOC_URL + 'pep-0401/'},
+    }
+    cli_args = Namespace(pep_source='json', workers=1)
+    with requests_mock.Mocker() as mock:
+        mock.get(main.PEP_JSON_URL, json=index)
+        mock.get(main.PEP_DOC_URL + 'pep-0401/',
+                 text='<dd><abbr>Rejected</abbr></dd>')
+        got = list(main.pep(requests.Session(), cli_args))
+        assert mock.call_count == 2, (
+            'Страницы PEP загружаются только для статусов, '
+            'не прошедших проверку'
+        )
+    assert got == [('Статус', 'Количество'), ('Active', 1), ('Final', 1),
+                   ('Rejected', 1), ('Итого:', 3)]
+
+
+def test_pep_json_source_error_status():
+    with requests_mock.Mocker() as mock:
+        mock.get(main.PEP_JSON_URL, status_code=404, text='Not Found')
+        with pytest.raises(ConnectionError):
+            list(main.pep(requests.Session(), Namespace(
+                pep_source='json', workers=1
+            )))
+
+
+def test_watch_outputs_only_changes(monkeypatch):
+    pages = iter([['Final'], ['Final'], ['Active'], ['Active']])
+    monkeypatch.setitem(
+        main.MODE_TO_FUNCTION, 'pep',
+        lambda session, cli_args: iter(next(pages))
+    )
+    outputs = []
+    monkeypatch.setattr(
+        main, 'control_output',
+        lambda results, cli_args: outputs.append(results)
+    )
+    sleeps = []
+    monkeypatch.setattr(main.time, 'sleep', sleeps.append)
+    cli_args = Namespace(mode='pep', watch=60, jitter=5)
+    evicted = []
+    session = SimpleNamespace(
+        persistent=True, evict=lambda: evicted.append(True)
+    )
+    main.watch(session, cli_args, cycles=4)
+    assert outputs == [['Final'], ['Active']], (
+        'В режиме наблюдения результаты выводятся только при изменении'
+    )
+    assert len(evicted) == 4, 'Кеш нужно ограничивать после каждого цикла'
+    assert len(sleeps) == 3 and all(60 <= sleep <= 65 for sleep in sleeps)
+
+
+def test_run_modes_separate_outputs(monkeypatch):
+    for mode in ('whats-new', 'pep'):
+        monkeypatch.setitem(
+            main.MODE_TO_FUNCTION, mode,
+            lambda session, cli_args: iter([(cli_args.mode,)])
+        )
+    outputs = []
+    monkeypatch.setattr(
+        main, 'control_output',
+        lambda results, cli_args: outputs.append((cli_args.mode, results))
+    )
+    cli_args = Namespace(
+        mode=['pep', 'whats-new', 'pep'], output=None, watch=None
+    )
+    main.run_modes(None, cli_args)
+    assert outputs == [('pep', [('pep',)]), ('whats-new', [('whats-new',)])], (
+        'Каждый режим должен выводить свои результаты отдельно'
+    )
+
+
+def test_run_modes_share_parsed_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    whats_new_url = main.MAIN_DOC_URL + 'whatsnew/'
+    whats_new_parsed, pep_done = threading.Event(), threading.Event()
+    count_statuses, content = main.count_statuses, main.get_content
+
+    def counted(statuses):
+        try:
+            return count_statuses(statuses)
+        finally:
+            pep_done.set()
+
+    def get_content(session, url):
+        if url == whats_new_url + '3.1.html':
+            whats_new_parsed.set()
+            pep_done.wait(10)
+        if url == main.PEP_DOC_URL:
+            whats_new_parsed.wait(10)
+        return content(session, url)
+
+    monkeypatch.setattr(main, 'count_statuses', counted)
+    monkeypatch.setattr(main, 'get_content', get_content)
+    outputs = []
+    monkeypatch.setattr(
+        main, 'control_output',
+        lambda results, cli_args: outputs.append((cli_args.mode, results))
+    )
+    cli_args = Namespace(
+        mode=['whats-new', 'pep'], output=None, watch=None, workers=1,
+        parsed_cache=True
+    )
+    with requests_mock.Mocker() as mock:
+        mock.get(whats_new_url, text=(
+            '<section id="what-s-new-in-python">'
+            '<div class="toctree-wrapper"><ul>'
+            '<li class="toctree-l1"><a href="3.0.html">3.0</a></li>'
+            '<li class="toctree-l1"><a href="3.1.html">3.1</a></li>'
+            '</ul></div></section>'
+        ))
+        mock.get(whats_new_url + '3.0.html',
+                 text='<h1>Python 3.0</h1><dl>Editor</dl>')
+        mock.get(whats_new_url + '3.1.html',
+                 text='<h1>Python 3.1</h1><dl>Editor</dl>')
+        mock.get(main.PEP_DOC_URL, text=(
+            '<section id="numerical-index">'
+            '<a class="pep reference internal" href="pep-0008/">8</a>'
+            '</section>'
+        ))
+        mock.get(main.PEP_DOC_URL + 'pep-0008/',
+                 text='<dd><abbr>Active</abbr></dd>')
+        main.run_modes(requests.Session(), cli_args)
+    assert [mode for mode, _ in outputs] == ['whats-new', 'pep'], (
+        'Режимы с общим кешем разобранных страниц не должны '
+        'блокировать друг друга'
+    )
+    assert outputs[1][1][-1] == ('Итого:', 1)
+
+
+def test_pep_shards_merge(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    statuses = ['Active', 'Final', 'Final', 'Draft', 'Withdrawn', 'Final']
+    pages = {
+        f'{main.PEP_DOC_URL}pep-{number:04d}/': (
+            f'<dd><abbr>{status}</abbr></dd>'
+        )
+        for number, status in enumerate(statuses)
+    }
+    with requests_mock.Mocker() as mock:
+        mock.get(main.PEP_DOC_URL, text=pep_index(pages))
+        for url, page in pages.items():
+            mock.get(url, text=page)
+        full = list(main.pep(requests.Session(), Namespace(workers=1)))
+        fetched = mock.call_count
+        for number in (1, 2):
+            list(main.pep(
+                requests.Session(), Namespace(workers=1, shard=(number, 2))
+            ))
+        assert mock.call_count - fetched == fetched + 1, (
+            'Каждая страница PEP должна попасть ровно в одну часть'
+        )
+    merged = list(main.merge(None, Namespace(shard_files=None)))
+    assert merged[0] == full[0] and merged[-1] == full[-1] == ('Итого:', 6)
+    assert sorted(merged[1:-1]) == sorted(full[1:-1]), (
+        'Объединённые части должны совпадать с полным подсчётом'
+    )
+
+
+def test_pep_incremental_shards(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    urls = [f'{main.PEP_DOC_URL}pep-{number:04d}/' for number in range(6)]
+    with requests_mock.Mocker() as mock:
+        mock.get(main.PEP_DOC_URL, text=pep_index(urls))
+        for url in urls:
+            mock.get(url, text='<dd><abbr>Final</abbr></dd>')
+        for number in (1, 2, 1, 2):
+            list(main.pep(requests.Session(), Namespace(
+                workers=1, incremental=True, shard=(number, 2)
+            )))
+    merged = list(main.merge(None, Namespace(shard_files=None)))
+    assert merged[-1] == ('Итого:', 6), (
+        'У каждой части должно быть своё состояние инкрементального режима'
+    )
+
+
+def test_pep_incremental_keeps_state_on_bad_index(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    url = f'{main.PEP_DOC_URL}pep-0001/'
+    cli_args = Namespace(workers=1, incremental=True, shard=None)
+    state_path = tmp_path / 'state' / main.PEP_STATE_FILE
+    with requests_mock.Mocker() as mock:
+        mock.get(main.PEP_DOC_URL, text=pep_index([url]))
+        mock.get(url, text='<dd><abbr>Final</abbr></dd>')
+        list(main.pep(requests.Session(), cli_args))
+        state = state_path.read_text()
+        mock.get(main.PEP_DOC_URL, status_code=500, text='<html></html>')
+        with pytest.raises(ConnectionError):
+            list(main.pep(requests.Session(), cli_args))
+    assert state_path.read_text() == state, (
+        'Ошибочный ответ индекса не должен перезаписывать состояние'
+    )
+
+
+def test_pep_resume_from_checkpoint(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    urls = [f'{main.PEP_DOC_URL}pep-{number:04d}/' for number in range(4)]
+    cli_args = Namespace(workers=1, checkpoint=True, resume=True)
+    checkpoint_path = tmp_path / 'state' / 'checkpoint-pep.json'
+    with requests_mock.Mocker() as mock:
+        mock.get(main.PEP_DOC_URL, text=pep_index(urls))
+        for url in urls[:2]:
+            mock.get(url, text='<dd><abbr>Final</abbr></dd>')
+        mock.get(urls[2], exc=KeyboardInterrupt)
+        with pytest.raises(KeyboardInterrupt):
+            list(main.pep(requests.Session(), cli_args))
+        assert checkpoint_path.exists(), (
+            'При сбое обработанные адреса сохраняются в контрольной точке'
+        )
+        for url in urls[2:]:
+            mock.get(url, text='<dd><abbr>Active</abbr></dd>')
+        calls = mock.call_count
+        got = list(main.pep(requests.Session(), cli_args))
+        assert mock.call_count - calls == 3, (
+            'С --resume загружаются только необработанные страницы'
+        )
+    assert got == [('Статус', 'Количество'), ('Final', 2), ('Active', 2),
+                   ('Итого:', 4)]
+    assert not checkpoint_path.exists(), (
+        'После успешного завершения контрольная точка удаляется'
+    )
+
+
+def test_resumable_keeps_url_order(tmp_path):
+    checkpoint = main.Checkpoint(tmp_path / 'checkpoint.json')
+    checkpoint.add('b', 'saved')
+    checkpoint.save()
+
+    def fetch(urls):
+        return ((url, url.upper(), None) for url in urls)
+
+    got = list(main.resumable(
+        ['a', 'b', 'c'], fetch,
+        main.Checkpoint(tmp_path / 'checkpoint.json', resume=True)
+    ))
+    assert got == [('a', 'A', None), ('b', 'saved', None), ('c', 'C', None)], (
+        'Результаты из контрольной точки отдаются в порядке адресов'
+    )
+
+
+LAZY_MODULES = ('bs4', 'lxml', 'prettytable', 'requests_cache', 'tqdm')
+IMPORT_BUDGET = 0.5
+
+
+def test_startup_import_time():
+    main_path = Path(main.__file__)
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', main_path.name, '--help'],
+        cwd=main_path.parent, capture_output=True, text=True, check=True
+    ).stderr
+    imports = [
+        line.split('|')[1:] for line in stderr.splitlines()
+        if line.startswith('import time:') and line.split('|')[1].strip()
+        .isdigit()
+    ]
+    eager = [
+        name.strip() for _, name in imports
+        if name.strip().split('.')[0] in LAZY_MODULES
+    ]
+    assert not eager, (
+        f'Модули {eager} должны импортироваться только при использовании'
+    )
+    startup = sum(
+        int(cumulative) for cumulative, name in imports
+        if not name.startswith('  ')
+    ) / 1_000_000
+    assert startup < IMPORT_BUDGET, (
+        f'Импорт модулей занимает {startup:.2f} с, бюджет {IMPORT_BUDGET} с'
+    )
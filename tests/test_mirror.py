@@ -0,0 +1,79 @@
+from argparse import Namespace
+from pathlib import Path
+
+import requests
+import requests_mock
+try:
+    from src import main, mirror
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `mirror.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `mirror.py`'
+
+
+def test_mirror_pack_and_index(tmp_path):
+    pages = mirror.Mirror(tmp_path)
+    pages.add('https://peps.python.org/pep-0008/', b'<abbr>Active</abbr>')
+    pages.add('https://peps.python.org/pep-0020/', b'<abbr>Active</abbr>')
+    pages.add('https://peps.python.org/pep-0020/', b'<abbr>Final</abbr>')
+    assert pages.read('https://peps.python.org/pep-0020/') == (
+        b'<abbr>Final</abbr>'
+    )
+    pages.close()
+    assert (tmp_path / 'pages.pack').stat().st_size == 37, (
+        'Одинаковое содержимое должно храниться в файле зеркала один раз'
+    )
+    offline = mirror.Mirror(tmp_path, offline=True)
+    assert len(offline) == 2
+    assert offline.response('https://peps.python.org/pep-0008/').content == (
+        b'<abbr>Active</abbr>'
+    )
+    assert offline.read('https://peps.python.org/pep-0001/') is None
+    offline.close()
+
+
+def test_mirror_mode_then_offline(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    pages = {
+        main.PEP_JSON_URL: '{}',
+        main.PEP_DOC_URL: (
+            '<section id="numerical-index">'
+            '<a class="pep reference internal" href="pep-0008/">8</a>'
+            '</section>'
+        ),
+        main.PEP_DOC_URL + 'pep-0008/': '<dd><abbr>Active</abbr></dd>',
+        main.MAIN_DOC_URL: (
+            '<div class="sphinxsidebarwrapper"><ul><li>'
+            '<a href="https://docs.python.org/3.12/">Python 3.12 (stable)</a>'
+            '</li><li><a href="/doc/versions/">All versions</a></li></ul></div>'
+        ),
+        main.MAIN_DOC_URL + 'whatsnew/': '<section></section>',
+    }
+    with requests_mock.Mocker() as mock:
+        for url, page in pages.items():
+            mock.get(url, text=page)
+        main.mirror(requests.Session(), Namespace(workers=1))
+    session = requests.Session()
+    session.mirror = mirror.Mirror(tmp_path / 'mirror', offline=True)
+    with requests_mock.Mocker() as mock:
+        got = list(main.pep(session, Namespace(workers=1)))
+        incremental = list(
+            main.pep(session, Namespace(workers=1, incremental=True))
+        )
+        assert not mock.called, 'В режиме offline запросы в сеть не отправляются'
+    assert got == [('Статус', 'Количество'), ('Active', 1), ('Итого:', 1)]
+    assert incremental == got
+
+
+def test_offline_download_reads_mirror(tmp_path):
+    from src import utils
+    url = 'https://docs.python.org/3/archives/python-docs-pdf-a4.zip'
+    pages = mirror.Mirror(tmp_path / 'mirror')
+    pages.add(url, b'archive')
+    pages.close()
+    session = requests.Session()
+    session.mirror = mirror.Mirror(tmp_path / 'mirror', offline=True)
+    with requests_mock.Mocker() as mock:
+        path = utils.download_file(session, url, tmp_path / 'docs.zip')
+        assert not mock.called, 'В режиме offline архив берётся из зеркала'
+    assert path.read_bytes() == b'archive'
@@ -90,3 +90,99 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+def test_file_output_streams_rows(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    consumed = []
+
+    def rows():
+        yield 'Статус', 'Количество'
+        for number in range(250):
+            consumed.append(number)
+            yield 'Active', number
+
+    outputs.control_output(rows(), cli_args('pep', 'file'))
+    output_file, = (tmp_path / 'results').glob('*.csv')
+    assert len(consumed) == 250
+    assert len(output_file.read_text().splitlines()) == 251, (
+        'Функция `file_output` должна записывать строки из генератора'
+    )
+
+
+@pytest.mark.parametrize('output_format', [
+    'file', 'csv.gz', 'csv.zst', 'jsonl', 'parquet'
+])
+def test_failed_mode_leaves_no_file(monkeypatch, tmp_path, output_format):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+
+    def rows():
+        raise ValueError('Ничего не нашлось')
+        yield
+
+    with pytest.raises(ValueError):
+        outputs.control_output(rows(), cli_args('pep', output_format))
+    assert not list((tmp_path / 'results').glob('*')), (
+        'Если режим упал до первой строки, файл результатов не создаётся'
+    )
+
+
+def read_jsonl(path):
+    import json
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def read_csv_gzip(path):
+    import csv
+    import gzip
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        return list(csv.reader(file))
+
+
+def read_csv_zstd(path):
+    import csv
+    import io
+    zstandard = pytest.importorskip('zstandard')
+    with zstandard.open(path, 'rt', encoding='utf-8') as file:
+        return list(csv.reader(io.StringIO(file.read())))
+
+
+def read_parquet(path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    return parquet.read_table(path).to_pylist()
+
+
+@pytest.mark.parametrize('output_format, read, expected', [
+    ('jsonl', read_jsonl, [{'Статус': 'Active', 'Количество': 36},
+                           {'Статус': 'Итого:', 'Количество': 36}]),
+    ('csv.gz', read_csv_gzip, [['Статус', 'Количество'], ['Active', '36'],
+                               ['Итого:', '36']]),
+    ('csv.zst', read_csv_zstd, [['Статус', 'Количество'], ['Active', '36'],
+                                ['Итого:', '36']]),
+    ('parquet', read_parquet, [{'Статус': 'Active', 'Количество': 36},
+                               {'Статус': 'Итого:', 'Количество': 36}]),
+])
+def test_control_output_formats(monkeypatch, tmp_path, output_format, read,
+                                 expected):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    records = [('Статус', 'Количество'), ('Active', 36), ('Итого:', 36)]
+    outputs.control_output(records, cli_args('pep', output_format))
+    output_file, = (tmp_path / 'results').glob(f'pep_*.{output_format}')
+    assert read(output_file) == expected, (
+        f'Проверьте сохранение результатов в формате {output_format}'
+    )
+
+
+def test_parquet_output_null_first_batch(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = [('Ссылка', 'Код ответа', 'Глубина')]
+    rows += [(f'https://docs.python.org/{number}', None, 1)
+             for number in range(outputs.FLUSH_ROWS)]
+    rows += [('https://docs.python.org/3/', 200, 0)]
+    outputs.control_output(rows, cli_args('crawl', 'parquet'))
+    output_file, = (tmp_path / 'results').glob('crawl_*.parquet')
+    got = read_parquet(output_file)
+    assert got[-1] == {
+        'Ссылка': 'https://docs.python.org/3/', 'Код ответа': 200,
+        'Глубина': 0
+    }, 'Пустые значения в первой части не должны ломать схему Parquet'
@@ -0,0 +1,32 @@
+try:
+    from src import parsed_cache
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `parsed_cache.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `parsed_cache.py`'
+
+calls = []
+
+
+def title(content):
+    calls.append(content)
+    return content.decode(), 'Editor'
+
+
+def test_parsed_cache_skips_parsing(tmp_path):
+    url = 'https://docs.python.org/3/whatsnew/3.12.html'
+    path = tmp_path / 'parsed.sqlite'
+    with parsed_cache.ParsedCache(path) as cache:
+        assert cache.parse(title, url, b'3.12') == ('3.12', 'Editor')
+    with parsed_cache.ParsedCache(path) as cache:
+        assert cache.parse(title, url, b'3.12') == ('3.12', 'Editor')
+        assert len(calls) == 1, (
+            'Страница с тем же содержимым не должна разбираться повторно'
+        )
+        assert cache.parse(title, url, b'3.13') == ('3.13', 'Editor')
+        assert len(calls) == 2
+        cache.versions[title] = 'changed selector'
+        cache.parse(title, url, b'3.13')
+        assert len(calls) == 3, (
+            'Смена версии функции разбора должна сбрасывать кеш'
+        )
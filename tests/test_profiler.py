@@ -0,0 +1,55 @@
+import time
+
+try:
+    from src import profiler
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `profiler.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `profiler.py`'
+
+
+class Response:
+    def __init__(self, from_cache):
+        self.from_cache = from_cache
+
+
+def test_stage_profiler_report():
+    stage_profiler = profiler.StageProfiler()
+
+    @stage_profiler.timed('parse')
+    def parse(page):
+        return page.upper()
+
+    assert parse('pep') == 'PEP'
+    assert stage_profiler.report()['stages'] == {}, (
+        'Выключенный профилировщик не должен собирать замеры'
+    )
+    stage_profiler.enabled = True
+    for page in range(10):
+        parse(str(page))
+        stage_profiler.cache_lookup(Response(from_cache=page % 2 == 0))
+    report = stage_profiler.report()
+    stats = report['stages']['parse']
+    assert stats['count'] == 10
+    assert stats['p50'] <= stats['p95'] <= stats['p99'] <= stats['total']
+    assert report['cache'] == {'hit': 5, 'miss': 5}
+
+
+def test_timed_writer_excludes_row_production():
+    stage_profiler = profiler.StageProfiler()
+    stage_profiler.enabled = True
+
+    def rows():
+        for number in range(3):
+            time.sleep(0.05)
+            yield number
+
+    @stage_profiler.timed_writer('output')
+    def write(results):
+        return list(results)
+
+    assert write(rows()) == [0, 1, 2]
+    assert stage_profiler.report()['stages']['output']['total'] < 0.05, (
+        'Время получения строк из генератора режима не входит '
+        'в этап вывода'
+    )
@@ -0,0 +1,73 @@
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+try:
+    from src import main, search
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `search.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `search.py`'
+
+PAGES = {
+    'https://peps.python.org/pep-0008/': (
+        b'<title>PEP 8 - Style Guide</title><p>style guide style code</p>'
+    ),
+    'https://peps.python.org/pep-0020/': (
+        b'<title>PEP 20 - The Zen</title><p>beautiful is better</p>'
+        b'<script>var style = 1;</script>'
+    ),
+    'https://peps.python.org/pep-0257/': (
+        b'<title>PEP 257 - Docstrings</title><p>docstring code style</p>'
+    ),
+}
+
+
+def test_search_ranking(tmp_path):
+    with search.SearchIndex(tmp_path) as index:
+        assert index.update(PAGES.items()) == 3
+    with search.SearchIndex(tmp_path) as index:
+        got = index.search('style')
+    assert [url for url, _, _ in got] == [
+        'https://peps.python.org/pep-0008/',
+        'https://peps.python.org/pep-0257/',
+    ], 'Страницы с большей частотой термина должны быть выше в выдаче'
+    assert got[0][1] == 'PEP 8 - Style Guide'
+
+
+def test_search_incremental_update(monkeypatch, tmp_path):
+    with search.SearchIndex(tmp_path) as index:
+        index.update(PAGES.items())
+    parsed = []
+    page_text = search.page_text
+    monkeypatch.setattr(
+        search, 'page_text',
+        lambda content: parsed.append(content) or page_text(content)
+    )
+    pages = {
+        **PAGES,
+        'https://peps.python.org/pep-0020/': b'<p>flat is better</p>',
+        'https://peps.python.org/pep-0257/': None,
+    }
+    del pages['https://peps.python.org/pep-0008/']
+    with search.SearchIndex(tmp_path) as index:
+        assert index.update(pages.items()) == 1
+        assert parsed == [b'<p>flat is better</p>'], (
+            'Заново разбираться должны только изменившиеся страницы'
+        )
+        assert [url for url, _, _ in index.search('style flat')] == [
+            'https://peps.python.org/pep-0020/',
+            'https://peps.python.org/pep-0257/',
+        ]
+        assert index.search('beautiful') == []
+
+
+def test_search_mode(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    with search.SearchIndex(tmp_path / 'index') as index:
+        index.update(PAGES.items())
+    got = list(main.search(None, Namespace(query='zen', limit=5)))
+    assert got[0] == ('Ссылка', 'Заголовок', 'Оценка')
+    assert got[1][0] == 'https://peps.python.org/pep-0020/'
+    with pytest.raises(ValueError):
+        list(main.search(None, Namespace(query=None)))
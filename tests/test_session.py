@@ -0,0 +1,123 @@
+import os
+import time
+from pathlib import Path
+
+import requests_mock
+try:
+    from src import session
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `session.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `session.py`'
+
+
+def test_evict_least_recently_used(monkeypatch, tmp_path):
+    monkeypatch.setattr(session, 'BASE_DIR', Path(tmp_path))
+    cache_name = str(tmp_path / 'http_cache')
+    parser_session = session.ParserSession(cache_name, max_size=50_000)
+    adapter = requests_mock.Adapter()
+    parser_session.mount('mock://', adapter)
+    for number in range(5):
+        url = f'mock://docs.python.org/{number}'
+        adapter.register_uri('GET', url, content=os.urandom(20_000))
+        parser_session.get(url)
+        time.sleep(0.01)
+    parser_session.get('mock://docs.python.org/0')
+    parser_session.close()
+    got = session.ParserSession(cache_name)
+    assert sorted(response.url for response in got.cache.filter()) == [
+        'mock://docs.python.org/0', 'mock://docs.python.org/4'
+    ], 'Из кеша должны удаляться давно не запрошенные страницы'
+    assert got.cache_size() <= 2 * 50_000
+    got.cache.delete(urls=['mock://docs.python.org/0'])
+    got.evict()
+    accessed = session.load_state(
+        tmp_path / session.STATE_DIR / session.CACHE_ACCESS_FILE, {}
+    )
+    assert sorted(accessed) == sorted(got.cache.responses.keys()), (
+        'Время обращения хранится только для страниц, оставшихся в кеше'
+    )
+
+
+def test_configure_session_pools_and_timeouts(tmp_path):
+    from src import configs
+    cli_args = configs.configure_argument_parser(['pep']).parse_args([
+        'pep', '--cache-backend', 'memory', '--workers', '16',
+        '--timeout', '3', '--retries', '2',
+        '--host-pool-size', 'peps.python.org=4', '--no-keep-alive'
+    ])
+    parser_session = configs.configure_session(cli_args)
+    assert parser_session.timeout == (3, 3)
+    assert parser_session.headers['Connection'] == 'close'
+    peps = parser_session.get_adapter('https://peps.python.org/pep-0008/')
+    docs = parser_session.get_adapter('https://docs.python.org/3/')
+    assert peps._pool_maxsize == 4, (
+        'Размер пула должен браться из --host-pool-size'
+    )
+    assert docs._pool_maxsize == 16, (
+        'Размер пула не должен быть меньше числа потоков'
+    )
+    assert docs.max_retries.total == 2
+    assert 502 in docs.max_retries.status_forcelist
+    assert type(docs).__name__ == 'RateLimitedAdapter'
+    parser_session.close()
+
+
+def test_concurrent_requests_are_shared():
+    from concurrent.futures import ThreadPoolExecutor
+    parser_session = session.ParserSession(backend='memory')
+    adapter = requests_mock.Adapter()
+    parser_session.mount('mock://', adapter)
+    url = 'mock://docs.python.org/3/'
+
+    def slow_page(request, context):
+        time.sleep(0.2)
+        return 'page'
+
+    adapter.register_uri('GET', url, text=slow_page)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(executor.map(
+            lambda _: parser_session.get(url), range(4)
+        ))
+    assert adapter.call_count == 1, (
+        'Одновременные запросы одной страницы должны отправляться один раз'
+    )
+    assert all(response.text == 'page' for response in responses)
+    assert not parser_session.in_flight
+
+
+def test_uncached_request_keeps_cache_enabled():
+    from src import utils
+    parser_session = session.ParserSession(backend='memory')
+    adapter = requests_mock.Adapter()
+    parser_session.mount('mock://', adapter)
+    cached_url = 'mock://docs.python.org/3/'
+    archive_url = 'mock://docs.python.org/3/archive.zip'
+    adapter.register_uri('GET', cached_url, text='page')
+    adapter.register_uri('GET', archive_url, content=b'zip')
+    parser_session.get(cached_url)
+    with utils.get_stream(parser_session, archive_url) as response:
+        assert not getattr(response, 'from_cache', False)
+        assert session.NO_CACHE_HEADER not in adapter.last_request.headers
+    assert parser_session.get(cached_url).from_cache, (
+        'Запрос мимо кеша не должен отключать кеш для всей сессии'
+    )
+    assert [response.url for response in parser_session.cache.filter()] == [
+        cached_url
+    ], 'Ответ на запрос мимо кеша не сохраняется в кеш'
+
+
+def test_streamed_response_is_not_read_by_cache():
+    from src import utils
+    parser_session = session.ParserSession(backend='memory')
+    adapter = requests_mock.Adapter()
+    parser_session.mount('mock://', adapter)
+    url = 'mock://peps.python.org/api/peps.json'
+    adapter.register_uri('GET', url, json={'8': {'status': 'Active'}})
+    response = utils.get_response(parser_session, url, stream=True)
+    assert not response._content_consumed, (
+        'Потоковый ответ должен читаться по частям, а не целиком в кеш'
+    )
+    assert dict(utils.iter_json_object(response.iter_content(4))) == {
+        '8': {'status': 'Active'}
+    }
@@ -0,0 +1,50 @@
+import bs4
+try:
+    from src import specs
+    from src.parsed_cache import ParsedCache
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `specs.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `specs.py`'
+
+WHATS_NEW_INDEX = '''<section id="what-s-new-in-python">
+<div class="toctree-wrapper compound"><ul>
+<li class="toctree-l1"><a href="3.12.html">What’s New In Python 3.12</a>
+<ul><li class="toctree-l2"><a href="3.12.html#summary">Summary</a></li></ul>
+</li>
+<li class="toctree-l1"><a href="changelog.html">Changelog</a></li>
+<li class="toctree-l1"><a href="3.11.html">What’s New In Python 3.11</a></li>
+</ul></div></section>'''
+DOWNLOAD_PAGE = '''<div class="body"><table class="docutils align-default">
+<tr><td>PDF</td><td><a href="archives/python-3.12-docs-pdf-letter.zip">
+letter</a></td><td><a href="archives/python-3.12-docs-pdf-a4.zip">A4</a>
+</td></tr></table></div>'''
+
+
+def test_links_specs_match_css_selectors():
+    for page, spec, selector in (
+        (WHATS_NEW_INDEX, specs.WHATS_NEW_LINKS,
+         '#what-s-new-in-python div.toctree-wrapper '
+         'li.toctree-l1 a[href$=".html"]'),
+        (DOWNLOAD_PAGE, specs.DOWNLOAD_LINKS,
+         'div table.docutils a[href$="a4.zip"]'),
+    ):
+        soup = bs4.BeautifulSoup(page, 'lxml')
+        expected = [(a['href'], a.text) for a in soup.select(selector)]
+        assert spec(page.encode()) == expected, (
+            f'Спецификация {spec.__name__} должна находить те же ссылки, '
+            'что и CSS-селектор'
+        )
+
+
+def test_texts_spec_version_follows_spec(tmp_path):
+    page = b'<h1>Title</h1><dl>Editor\nName</dl>'
+    assert specs.WHATS_NEW_PAGE(page) == ('Title', 'EditorName')
+    changed = specs.TextsSpec('whats_new_fields', {'title': 'h1'})
+    with ParsedCache(tmp_path / 'parsed.sqlite') as cache:
+        assert cache.parse(specs.WHATS_NEW_PAGE, 'url', page) == (
+            'Title', 'EditorName'
+        )
+        assert cache.parse(changed, 'url', page) == ('Title',), (
+            'Изменение спецификации должно делать кеш недействительным'
+        )
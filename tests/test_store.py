@@ -0,0 +1,151 @@
+import sqlite3
+from argparse import Namespace
+from pathlib import Path
+
+import requests
+import requests_mock
+try:
+    from src import main, outputs
+    import store
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `store.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `store.py`'
+
+PEP_8 = 'https://peps.python.org/pep-0008/'
+PEP_20 = 'https://peps.python.org/pep-0020/'
+
+
+def run_pep(statuses, shard=None):
+    cli_args = Namespace(mode='pep', output='db', shard=shard)
+    recorded = store.record_pep_statuses(
+        ((url, status, None) for url, status in statuses), cli_args
+    )
+    counts = {}
+    for _, status, _ in recorded:
+        counts[status] = counts.get(status, 0) + 1
+    outputs.control_output(
+        [('Статус', 'Количество'), *counts.items()], cli_args
+    )
+
+
+def test_db_output_history(monkeypatch, tmp_path):
+    monkeypatch.setattr(store, 'BASE_DIR', Path(tmp_path))
+    run_pep([(PEP_8, 'Active'), (PEP_20, 'Draft')])
+    run_pep([(PEP_8, 'Active'), (PEP_20, 'Final')])
+    result_store = store.ResultStore(tmp_path / 'results.sqlite')
+    assert result_store.status_changes() == [(PEP_20, 'Draft', 'Final')], (
+        'Хранилище должно находить PEP, статус которых изменился'
+    )
+    counts = result_store.connection.execute(
+        'SELECT run_id, status, count FROM pep_counts ORDER BY run_id, status'
+    ).fetchall()
+    assert counts == [
+        (1, 'Active', 1), (1, 'Draft', 1), (2, 'Active', 1), (2, 'Final', 1)
+    ]
+
+
+def test_db_output_mode_rows(monkeypatch, tmp_path):
+    monkeypatch.setattr(store, 'BASE_DIR', Path(tmp_path))
+    outputs.control_output(
+        [('Ссылка на документацию', 'Версия', 'Статус'),
+         ('https://docs.python.org/3.12/', '3.12', 'stable')],
+        Namespace(mode='latest-versions', output='db')
+    )
+    result_store = store.ResultStore(tmp_path / 'results.sqlite')
+    assert result_store.connection.execute(
+        'SELECT version, status FROM latest_versions'
+    ).fetchall() == [('3.12', 'stable')]
+    outputs.control_output(
+        [('Ссылка', 'Код ответа', 'Глубина'), (PEP_8, 200, 0)],
+        Namespace(mode='crawl', output='db')
+    )
+    assert result_store.connection.execute(
+        'SELECT typeof(status) FROM crawl_pages'
+    ).fetchall() == [('integer',)], (
+        'Код ответа обхода хранится числом'
+    )
+
+
+def test_watch_db_output_skipped_cycles(monkeypatch, tmp_path):
+    monkeypatch.setattr(store, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(main.time, 'sleep', lambda seconds: None)
+    cli_args = Namespace(mode='pep', output='db', watch=60, jitter=0,
+                         workers=1)
+    with requests_mock.Mocker() as mock:
+        mock.get(main.PEP_DOC_URL, text=(
+            '<section id="numerical-index">'
+            f'<a class="pep reference internal" href="{PEP_8}">8</a>'
+            f'<a class="pep reference internal" href="{PEP_20}">20</a>'
+            '</section>'
+        ))
+        mock.get(PEP_8, text='<dd><abbr>Active</abbr></dd>')
+        mock.get(PEP_20, text='<dd><abbr>Final</abbr></dd>')
+        main.watch(requests.Session(), cli_args, cycles=3)
+    assert cli_args.result_run is None, (
+        'Запуск в базе закрывается и в циклах без изменений'
+    )
+    result_store = store.ResultStore(tmp_path / 'results.sqlite')
+    statuses = result_store.connection.execute(
+        'SELECT run_id, COUNT(*) FROM pep_statuses GROUP BY run_id'
+    ).fetchall()
+    assert all(rows == 2 for _, rows in statuses), (
+        'Статусы цикла без изменений не дописываются в прошлый запуск'
+    )
+
+
+def test_db_output_first_run_and_failed_run(monkeypatch, tmp_path):
+    monkeypatch.setattr(store, 'BASE_DIR', Path(tmp_path))
+    run_pep([(PEP_8, 'Active'), (PEP_20, 'Draft')])
+    result_store = store.ResultStore(tmp_path / 'results.sqlite')
+    assert result_store.status_changes() == [], (
+        'После первого запуска изменившихся статусов нет'
+    )
+
+    def failing_rows():
+        yield 'Статус', 'Количество'
+        raise ConnectionError
+
+    cli_args = Namespace(mode='pep', output='db')
+    list(store.record_pep_statuses(iter([(PEP_8, 'Final', None)]), cli_args))
+    try:
+        outputs.control_output(failing_rows(), cli_args)
+    except ConnectionError:
+        store.close_run(cli_args)
+    assert result_store.connection.execute(
+        'SELECT COUNT(*) FROM runs'
+    ).fetchone() == (1,), (
+        'Запуск без подсчёта статусов не должен сохраняться'
+    )
+
+
+def test_status_changes_per_shard(monkeypatch, tmp_path):
+    monkeypatch.setattr(store, 'BASE_DIR', Path(tmp_path))
+    run_pep([(PEP_8, 'Active')], shard=(1, 2))
+    run_pep([(PEP_20, 'Draft')], shard=(2, 2))
+    result_store = store.ResultStore(tmp_path / 'results.sqlite')
+    assert result_store.status_changes() == [], (
+        'Запуски разных частей не должны сравниваться между собой'
+    )
+    run_pep([(PEP_8, 'Final')], shard=(1, 2))
+    assert result_store.status_changes() == [(PEP_8, 'Active', 'Final')], (
+        'Запуск сравнивается с прошлым запуском той же части'
+    )
+
+
+def test_result_store_adds_run_key(tmp_path):
+    path = tmp_path / 'results.sqlite'
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE runs (id INTEGER PRIMARY KEY, mode TEXT NOT NULL, '
+        'started_at TEXT NOT NULL)'
+    )
+    connection.close()
+    result_store = store.ResultStore(path)
+    result_store.start_run('pep', 'pep-1-of-2')
+    assert result_store.connection.execute(
+        'SELECT mode, key FROM runs'
+    ).fetchall() == [('pep', 'pep-1-of-2')], (
+        'В базу прошлой версии добавляется ключ запуска'
+    )
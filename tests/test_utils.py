@@ -1,10 +1,12 @@
+import hashlib
 import pytest
 import requests
 import requests_mock
 import bs4
 from conftest import MAIN_DOC_URL
+from fixture_data import pages
 try:
-    from src import utils
+    from src import main, specs, utils
 except ModuleNotFoundError:
     assert False, 'Убедитесь что в директории `src` есть файл `utils.py`'
 except ImportError:
@@ -54,3 +56,164 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_fetch_all_keeps_order(workers):
+    def fetch(session, url):
+        if url.endswith('3'):
+            raise ConnectionError(url)
+        return url.upper()
+
+    urls = [f'mock://page-{number}' for number in range(6)]
+    got = list(utils.fetch_all(None, urls, workers, fetch=fetch))
+    assert [url for url, _, _ in got] == urls, (
+        'Функция `fetch_all` должна сохранять порядок ссылок'
+    )
+    assert got[0][1] == 'MOCK://PAGE-0'
+    assert isinstance(got[3][2], ConnectionError), (
+        'Функция `fetch_all` должна возвращать ошибку загрузки, '
+        'а не прерывать обход'
+    )
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_parse_all_keeps_order(processes):
+    error = ConnectionError('mock://page-1')
+    pages = [
+        ('mock://page-0', 'first', None),
+        ('mock://page-1', None, error),
+        ('mock://page-2', 'third', None),
+    ]
+    got = list(utils.parse_all(iter(pages), str.upper, processes))
+    assert got == [
+        ('mock://page-0', 'FIRST', None),
+        ('mock://page-1', None, error),
+        ('mock://page-2', 'THIRD', None),
+    ], 'Функция `parse_all` должна сохранять порядок страниц'
+
+
+def test_parse_all_streams_pages():
+    fetched = []
+
+    def pages():
+        for number in range(100):
+            fetched.append(number)
+            yield f'mock://page-{number}', f'page {number}', None
+
+    parsed = utils.parse_all(pages(), str.upper, 2)
+    assert next(parsed) == ('mock://page-0', 'PAGE 0', None)
+    parsed.close()
+    assert len(fetched) <= 2 * utils.PARSE_WINDOW, (
+        'Функция `parse_all` должна отдавать результаты, '
+        'не дожидаясь загрузки всех страниц'
+    )
+
+
+def test_download_file_resumes_and_skips(tmp_path):
+    content = b'You are breathtaken' * 1000
+    headers = {
+        'Content-Length': str(len(content)),
+        'ETag': '"archive"',
+        'Accept-Ranges': 'bytes',
+    }
+
+    def archive(request, context):
+        context.headers.update(headers)
+        start = request.headers.get('Range', 'bytes=0-')[6:-1]
+        if start != '0':
+            context.status_code = 206
+        return content[int(start):]
+
+    url = 'https://docs.python.org/3/archives/docs.zip'
+    path = tmp_path / 'docs.zip'
+    path.write_bytes(content[:100])
+    (tmp_path / 'docs.zip.etag').write_text('"archive"')
+    with requests_mock.Mocker() as mock:
+        mock.head(url, headers=headers)
+        mock.get(url, content=archive)
+        utils.download_file(requests.Session(), url, path)
+        assert mock.last_request.headers['Range'] == 'bytes=100-', (
+            'Функция `download_file` должна докачивать частичный файл'
+        )
+        assert path.read_bytes() == content
+        calls = mock.call_count
+        utils.download_file(requests.Session(), url, path)
+        assert mock.call_count == calls + 1, (
+            'Функция `download_file` не должна скачивать совпадающий файл'
+        )
+
+
+def test_download_file_segments(tmp_path):
+    content = bytes(range(256)) * 100
+    headers = {
+        'Content-Length': str(len(content)),
+        'ETag': '"archive"',
+        'Accept-Ranges': 'bytes',
+    }
+
+    def archive(request, context):
+        start, end = request.headers['Range'][6:].split('-')
+        context.status_code = 206
+        return content[int(start):int(end) + 1]
+
+    url = 'https://docs.python.org/3/archives/docs.zip'
+    path = tmp_path / 'docs.zip'
+    checksum = hashlib.sha256(content).hexdigest()
+    with requests_mock.Mocker() as mock:
+        mock.head(url, headers=headers)
+        mock.get(url, content=archive)
+        utils.download_file(requests.Session(), url, path, 3, checksum)
+        assert mock.call_count == 4, (
+            'Функция `download_file` должна загружать архив частями'
+        )
+        assert path.read_bytes() == content
+        path.unlink()
+        with pytest.raises(BaseException) as excinfo:
+            utils.download_file(requests.Session(), url, path, 3, '0' * 64)
+    assert excinfo.typename == 'DownloadCheckException'
+
+
+@pytest.mark.parametrize('page, tags', [
+    (pages.pep_page, ('abbr',)),
+    (pages.whats_new_page, ('h1', 'dl')),
+    ('<dl><dt>Editor</dt><dl><dd>x</dd></dl><dd>Name</dd></dl>', ('dl',)),
+])
+def test_find_texts_matches_find_tag(page, tags):
+    soup = bs4.BeautifulSoup(page, 'lxml')
+    expected = tuple(utils.find_tag(soup, tag).text for tag in tags)
+    assert utils.find_texts(page.encode(), *tags) == expected, (
+        'Функция `find_texts` должна возвращать тот же текст, что и '
+        '`find_tag`'
+    )
+
+
+def test_find_texts_exception():
+    with pytest.raises(BaseException) as excinfo:
+        utils.find_texts(pages.pep_page.encode(), 'abbr', 'unexpected')
+    assert excinfo.typename == 'ParserFindTagException'
+
+
+def test_find_links_matches_select():
+    soup = bs4.BeautifulSoup(pages.main_page, 'lxml')
+    for ul in soup.select('div.sphinxsidebarwrapper ul'):
+        if 'All versions' in ul.text:
+            expected = [(a['href'], a.text) for a in ul.find_all('a')]
+            break
+    got = utils.find_links(
+        pages.main_page.encode(), specs.VERSION_LINKS.xpath
+    )
+    assert got == expected, (
+        'Функция `find_links` должна находить те же ссылки, что и '
+        '`select`'
+    )
+
+
+def test_iter_json_object_chunks():
+    content = '{"8": {"status": "Active"}, "20": {"title": "Дзен"}}'.encode()
+    chunks = (content[start:start + 3] for start in range(0, len(content), 3))
+    assert list(utils.iter_json_object(chunks)) == [
+        ('8', {'status': 'Active'}), ('20', {'title': 'Дзен'})
+    ]
+    with pytest.raises(ValueError):
+        list(utils.iter_json_object([b'{"8": {"status"']))